@@ -0,0 +1,92 @@
+#!/usr/bin/python
+
+# Benchmark allowed characters check and codepoint file loading: per character loops vs set operations
+
+import io
+import os
+import re
+import sys
+import time
+import codecs
+import argparse
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+
+def legacyReadCodepoints(inputFilename):
+    characterSet = set({ ' ', '\t' })
+    with codecs.open(inputFilename, "r", "utf-8") as inputFile:
+        while True:
+            prefix = inputFile.read(2)
+            if not prefix:
+                break
+            codepoint = inputFile.read(4)
+            characterSet.add(chr(int(codepoint, 16)))
+    return characterSet
+
+def legacyCheck(allowedCharacters, items):
+    result = []
+    for (key, value), (translateKey, translateValue) in items:
+        invalidCharacters = set()
+        for translateChar in translateValue:
+            if (translateChar not in allowedCharacters) and (translateChar not in value):
+                invalidCharacters.add(translateChar)
+        result.append(invalidCharacters)
+    return result
+
+def setCheck(allowedCharacters, items):
+    notAllowedCharacterExpr = re.compile('[^' + ''.join(re.escape(character) for character in sorted(allowedCharacters)) + ']')
+    result = []
+    for (key, value), (translateKey, translateValue) in items:
+        invalidCharacters = set()
+        if notAllowedCharacterExpr.search(translateValue):
+            invalidCharacters = set(translateValue) - allowedCharacters
+            invalidCharacters.difference_update(value)
+        result.append(invalidCharacters)
+    return result
+
+def main(args):
+    # every value translated, one in hundred with letter not in allowed set
+    items = list(zip(makeIniItems(args.keys), makeIniItems(args.keys, translated=True)))
+    for index in range(0, len(items), 100):
+        (key, value), (translateKey, translateValue) = items[index]
+        items[index] = (key, value), (translateKey, translateValue + ' ыъ')
+    characters = allowedCharacters()
+    with tempfile.TemporaryDirectory() as tempDir:
+        codepointsFile = os.path.join(tempDir, 'allowed_codepoints.txt')
+        # real codepoint files list whole Unicode blocks
+        writeCodepointsFile(codepointsFile, characters + ''.join(chr(code) for code in range(0x2000, 0x2000 + args.codepoints)))
+        startTime = time.perf_counter()
+        legacyCharacters = legacyReadCodepoints(codepointsFile)
+        legacyLoadTime = time.perf_counter() - startTime
+        startTime = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            verifier = LocalizationVerifier({ 'allowed_characters_file': codepointsFile })
+        loadTime = time.perf_counter() - startTime
+    if legacyCharacters != verifier.allowedCharacters:
+        print('Error: loaded codepoints mismatch')
+        return 1
+    startTime = time.perf_counter()
+    legacyResult = legacyCheck(verifier.allowedCharacters, items)
+    legacyTime = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    setResult = setCheck(verifier.allowedCharacters, items)
+    setTime = time.perf_counter() - startTime
+    if legacyResult != setResult:
+        print('Error: invalid characters mismatch')
+        return 1
+    print(f'Keys: {args.keys}, translated characters: {sum(len(item[1][1]) for item in items)}, with invalid characters: {sum(1 for result in setResult if result)}')
+    print(f'Codepoints: {len(legacyCharacters)}')
+    print(f'codecs loader   : {legacyLoadTime * 1000:.1f} ms')
+    print(f'bulk + class    : {loadTime * 1000:.1f} ms ({legacyLoadTime / loadTime:.1f}x)')
+    print(f'per char check  : {legacyTime:.2f}s')
+    print(f'regex/set check : {setTime:.2f}s ({legacyTime / setTime:.1f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark allowed characters check', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys')
+    parser.add_argument('-c', '--codepoints', type=int, default=4000, help='Number of additional allowed codepoints')
+    sys.exit(main(parser.parse_args()))
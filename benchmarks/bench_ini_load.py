@@ -0,0 +1,44 @@
+#!/usr/bin/python
+
+# Benchmark INI loading: codecs line-by-line loader vs LocalizationIni.FromIniFile
+
+import os
+import sys
+import codecs
+import argparse
+import tempfile
+import collections
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+from timing import measure
+
+def legacyLoadFromIniFile(filename):
+    data = collections.OrderedDict()
+    with codecs.open(filename, "r", "utf-8") as inputFile:
+        for line in inputFile:
+            strippedLine = line.strip("\r\n\t\ufeff")
+            if strippedLine:
+                parts = strippedLine.split('=', 1)
+                data[parts[0]] = parts[1]
+    return data
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        filename = os.path.join(tempDir, 'global.ini')
+        writeIniFile(filename, makeIniItems(args.keys))
+        legacyTime, legacyData = measure(lambda: legacyLoadFromIniFile(filename), args.repeat)
+        bulkTime, bulkIni = measure(lambda: LocalizationIni.FromIniFile(filename), args.repeat)
+        if list(legacyData.items()) != list(bulkIni.getItems()):
+            print('Error: loaded data mismatch')
+            return 1
+        print(f'Keys: {args.keys}')
+        print(f'codecs loader: {legacyTime:.3f}s')
+        print(f'bulk loader  : {bulkTime:.3f}s ({legacyTime / bulkTime:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark INI file loading', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in synthetic INI file')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of measurements (best is reported)')
+    sys.exit(main(parser.parse_args()))
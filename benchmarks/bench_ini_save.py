@@ -0,0 +1,54 @@
+#!/usr/bin/python
+
+# Benchmark INI saving: codecs writer vs LocalizationIni.saveToIniFile
+
+import os
+import sys
+import codecs
+import argparse
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+from timing import measure
+
+def legacySaveToIniFile(filename, items):
+    with codecs.open(filename, "w", "utf-8") as outputFile:
+        outputFile.write('\ufeff')
+        for key, value in items:
+            outputFile.write(key)
+            outputFile.write('=')
+            outputFile.write(value)
+            outputFile.write('\r\n')
+
+def main(args):
+    items = makeIniItems(args.keys, translated=True)
+    ini = LocalizationIni.Empty()
+    for key, value in items:
+        ini.putKeyValue(key, value)
+    with tempfile.TemporaryDirectory() as tempDir:
+        legacyFilename = os.path.join(tempDir, 'legacy.ini')
+        bulkFilename = os.path.join(tempDir, 'bulk.ini')
+        streamFilename = os.path.join(tempDir, 'stream.ini')
+        legacyTime = measure(lambda: legacySaveToIniFile(legacyFilename, items), args.repeat)[0]
+        bulkTime = measure(lambda: ini.saveToIniFile(bulkFilename), args.repeat)[0]
+        streamTime = measure(lambda: LocalizationIni.SaveItemsToIniFile(streamFilename, ((key, value) for key, value in items)), args.repeat)[0]
+        with open(legacyFilename, 'rb') as legacyFile:
+            legacyData = legacyFile.read()
+        for filename in (bulkFilename, streamFilename):
+            with open(filename, 'rb') as outputFile:
+                if outputFile.read() != legacyData:
+                    print(f'Error: output mismatch - {os.path.basename(filename)}')
+                    return 1
+        megabytes = len(legacyData) / 1048576
+        print(f'Keys: {args.keys} ({megabytes:.1f} MiB)')
+        print(f'codecs writer   : {legacyTime:.3f}s ({megabytes / legacyTime:.1f} MiB/s)')
+        print(f'buffered writer : {bulkTime:.3f}s ({megabytes / bulkTime:.1f} MiB/s, {legacyTime / bulkTime:.2f}x)')
+        print(f'generator writer: {streamTime:.3f}s ({megabytes / streamTime:.1f} MiB/s, {legacyTime / streamTime:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark INI file saving', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in synthetic INI file')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of measurements (best is reported)')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,58 @@
+#!/usr/bin/python
+
+# Benchmark prefix rules: linear startswith scan vs PrefixMatcher
+
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+
+def makeRules(count, seed):
+    rnd = random.Random(seed)
+    words = [ 'ui', 'item', 'Name', 'interactor', 'mission', 'convo', 'Bartender', 'Greeter', 'shop', 'hangar', 'PU', 'DXSM' ]
+    rules = {}
+    while len(rules) < count:
+        prefix = '_'.join(rnd.choice(words) for i in range(rnd.randint(1, 4))) + '_'
+        rules[prefix] = rnd.random() < 0.8
+    return rules
+
+def makeKeys(rules, count, seed):
+    rnd = random.Random(seed)
+    prefixes = list(rules)
+    keys = []
+    for key, value in makeIniItems(count, seed):
+        keys.append(rnd.choice(prefixes) + key if rnd.random() < 0.5 else key)
+    return keys
+
+def main(args):
+    rules = makeRules(args.rules, 1)
+    # with single rule value first match and longest match give same answer
+    includeRules = { prefix: True for prefix, value in rules.items() if value }
+    keys = makeKeys(includeRules, args.keys, 2)
+    includeList = list(includeRules)
+    startTime = time.perf_counter()
+    legacyResult = [ any(key.startswith(prefix) for prefix in includeList) for key in keys ]
+    legacyTime = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    matcher = PrefixMatcher(includeRules)
+    compileTime = time.perf_counter() - startTime
+    startTime = time.perf_counter()
+    matcherResult = [ matcher.match(key, False) for key in keys ]
+    matcherTime = time.perf_counter() - startTime
+    if legacyResult != matcherResult:
+        print('Error: match results mismatch')
+        return 1
+    print(f'Rules: {len(includeRules)}, keys: {len(keys)}, matched: {sum(matcherResult)}')
+    print(f'startswith scan: {legacyTime:.2f}s')
+    print(f'PrefixMatcher  : {matcherTime:.3f}s (+{compileTime * 1000:.1f} ms compile, {legacyTime / matcherTime:.0f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark prefix rules matching', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-r', '--rules', type=int, default=5000, help='Number of prefix rules')
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys')
+    sys.exit(main(parser.parse_args()))
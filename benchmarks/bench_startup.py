@@ -0,0 +1,55 @@
+#!/usr/bin/python
+
+# Benchmark startup of INI only commands with python -X importtime and fail
+# when they import XLSX, XLIFF, transliteration or data frame backends
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from synthetic import *
+
+rootPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+forbiddenModules = [ 'pandas', 'numpy', 'openpyxl', 'transliterate', 'zipfile', 'xml.etree.ElementTree', 'modules.xlsx', 'multiprocessing' ]
+
+def runImportTime(command, workDir):
+    startTime = time.perf_counter()
+    process = subprocess.run([ sys.executable, '-X', 'importtime' ] + command, cwd=workDir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - startTime
+    modules = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        selfTime, cumulativeTime, moduleName = [ x.strip() for x in line[len('import time:'):].split('|', 2) ]
+        modules[moduleName.strip()] = int(cumulativeTime)
+    return process.returncode, elapsed, modules
+
+def main(args):
+    result = 0
+    with tempfile.TemporaryDirectory() as tempDir:
+        filename = os.path.join(tempDir, 'global.ini')
+        writeIniFile(filename, makeIniItems(args.keys))
+        commands = {
+            'transform_ini.py': [ os.path.join(rootPath, 'transform_ini.py'), '--test', filename ],
+            'multilang_to_ini.py (INI)': [ os.path.join(rootPath, 'multilang_to_ini.py'), filename, filename, '--ref', filename,
+                                           '--output', os.path.join(tempDir, 'out.ini'), '--no-cache' ],
+        }
+        for name, command in commands.items():
+            returnCode, elapsed, modules = runImportTime(command, tempDir)
+            localizationTime = modules.get('modules.localization', 0)
+            print(f'{name}: {elapsed * 1000:.0f} ms wall, modules.localization import {localizationTime / 1000:.1f} ms')
+            if returnCode != 0:
+                print(f'Error: {name} failed with code {returnCode}')
+                result = 1
+            loaded = [ x for x in forbiddenModules if x in modules ]
+            if loaded:
+                print(f'Error: {name} imports heavy backends: {", ".join(loaded)}')
+                result = 1
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check startup imports of INI only commands', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=1000, help='Number of keys in synthetic INI file')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,51 @@
+#!/usr/bin/python
+
+# Benchmark memory of loaded INI: OrderedDict storage vs compact storage
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+
+def measureLoad(filename, compact):
+    LocalizationIni.SetCompactStorage(compact)
+    tracemalloc.start()
+    startTime = time.perf_counter()
+    ini = LocalizationIni.FromIniFile(filename)
+    elapsed = time.perf_counter() - startTime
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    startTime = time.perf_counter()
+    for key, value in ini.getItems():
+        ini.getKeyValue(key)
+    lookupTime = time.perf_counter() - startTime
+    return ini, size, peak, elapsed, lookupTime
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        filename = args.input
+        if not filename:
+            filename = os.path.join(tempDir, 'global.ini')
+            writeIniFile(filename, makeIniItems(args.keys))
+        print(f'Input: {filename} ({os.path.getsize(filename)} bytes)')
+        dictIni, dictSize, dictPeak, dictLoad, dictLookup = measureLoad(filename, False)
+        compactIni, compactSize, compactPeak, compactLoad, compactLookup = measureLoad(filename, True)
+        if list(dictIni.getItems()) != list(compactIni.getItems()):
+            print('Error: loaded data mismatch')
+            return 1
+        print(f'Keys: {dictIni.getItemsCount()}')
+        print(f'OrderedDict: {dictSize / 1048576:.1f} MiB resident, {dictPeak / 1048576:.1f} MiB peak, load {dictLoad:.3f}s, lookup {dictLookup:.3f}s')
+        print(f'Compact    : {compactSize / 1048576:.1f} MiB resident, {compactPeak / 1048576:.1f} MiB peak, load {compactLoad:.3f}s, lookup {compactLookup:.3f}s')
+        print(f'Reduction  : {dictSize / compactSize:.2f}x resident, {dictPeak / compactPeak:.2f}x peak')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark memory usage of loaded INI storage', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('input', nargs='?', metavar='FILENAME', default=None, help='INI file to load (synthetic file is generated if omitted)')
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in synthetic INI file')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+
+# Benchmark reference merge of multilang_to_ini: loaded reference vs lazily read reference
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from synthetic import *
+
+scriptFilename = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'multilang_to_ini.py')
+
+# run script in child process to measure its own peak resident memory
+runnerCode = '''
+import os, sys, runpy, resource
+sys.argv = sys.argv[1:]
+sys.path.insert(0, os.path.dirname(sys.argv[0]))
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit as err:
+    if err.code:
+        raise
+print('maxrss', resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)
+'''
+
+def measure(tempDir, outputFilename, options):
+    command = [ sys.executable, '-c', runnerCode, scriptFilename, 'original.ini', 'translate.ini', '-r', 'reference.ini',
+                '-o', outputFilename, '-a', 'allowed_codepoints.txt', '--no-cache', '-q', '-v', '1.0' ] + options
+    startTime = time.perf_counter()
+    result = subprocess.run(command, cwd=tempDir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    elapsed = time.perf_counter() - startTime
+    maxRss = int(result.stderr.split()[-1])
+    with open(os.path.join(tempDir, outputFilename), 'rb') as outputFile:
+        return elapsed, maxRss, outputFile.read()
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        referenceItems = makeIniItems(args.keys)
+        # original is older reference: part of values changed since translation
+        originalItems = [ (key, value + ' old' if i % 10 == 0 else value) for i, (key, value) in enumerate(referenceItems) ]
+        translateItems = [ (key, value) for (key, _), (_, value) in zip(referenceItems, makeIniItems(args.keys, translated=True)) ]
+        writeIniFile(os.path.join(tempDir, 'reference.ini'), referenceItems)
+        writeIniFile(os.path.join(tempDir, 'original.ini'), originalItems)
+        writeIniFile(os.path.join(tempDir, 'translate.ini'), translateItems)
+        writeCodepointsFile(os.path.join(tempDir, 'allowed_codepoints.txt'), allowedCharacters())
+        for mode, options in [ ('merge', []), ('import', [ '--build-import' ]) ]:
+            loadedTime, loadedRss, loadedOutput = measure(tempDir, 'loaded.ini', options)
+            streamTime, streamRss, streamOutput = measure(tempDir, 'stream.ini', options + [ '--stream-ref' ])
+            if loadedOutput != streamOutput:
+                print(f'Error: {mode} output mismatch')
+                return 1
+            print(f'Keys: {args.keys}, mode: {mode}, output: {len(streamOutput)} bytes')
+            print(f'  loaded reference : {loadedTime:.2f}s, {loadedRss / 1024:.1f} MiB max RSS')
+            print(f'  stream reference : {streamTime:.2f}s, {streamRss / 1024:.1f} MiB max RSS ({loadedRss / streamRss:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark memory of reference merge', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,145 @@
+#!/usr/bin/python
+
+# Benchmark all pipeline stages on deterministic synthetic data set and compare with stored baseline
+#
+#   bench_suite.py -o baseline.json                # store baseline
+#   bench_suite.py -o current.json -b baseline.json  # compare, fails when a stage is slower than tolerance
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from modules.report import Report
+from synthetic import *
+from timing import measure
+import multilang_to_ini
+import transform_ini
+
+resultsVersion = 1
+
+def quietly(function):
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function()
+    return run
+
+def verifyStage(options, originalIni, translationIni):
+    def run():
+        LocalizationVerifier.SetReport(Report(False))
+        LocalizationVerifier(options).verify(originalIni, translationIni)
+    return quietly(run)
+
+def mergeStage(referenceIni, originalIni, translationIni):
+    args = argparse.Namespace(build_import=False, no_outdated_translation=False, no_inner_thought=True)
+    def run():
+        multilang_to_ini.report = Report(False)
+        multilang_to_ini.referenceIni = referenceIni
+        return list(multilang_to_ini.mergeReferenceItems(referenceIni.getItems(), originalIni, translationIni, '1.0', args))
+    return run
+
+def transformStage(translationIni):
+    def run():
+        transform_ini.report = Report(False)
+        return [ transform_ini.transform_text(key, value) for key, value in translationIni.getItems() ]
+    return run
+
+def transliterateStage(translationIni):
+    from transliterate import translit
+    def run():
+        return [ translit(value, 'uk', reversed=True) for key, value in translationIni.getItems() ]
+    return run
+
+def getStages(files, splitDocuments, tempDir):
+    referenceIni = LocalizationIni.FromIniFile(files['reference'])
+    originalIni = LocalizationIni.FromIniFile(files['original'])
+    translationIni = LocalizationIni.FromIniFile(files['translation'])
+    verifyOptions = { 'allowed_characters_file': files['allowed_codepoints'], 'lost_newline': 'true', 'space_before_newline': 'true', 'english_words_mismatch': 'true' }
+    multilang_to_ini.innerThroughtRules = PrefixMatcher.FromRulesFile(files['inner_thought'])
+    stages = [
+        ('ini-load', referenceIni.getItemsCount(), lambda: LocalizationIni.FromIniFile(files['reference'])),
+        ('ini-stream', referenceIni.getItemsCount(), lambda: sum(1 for item in LocalizationIni.IterIniFile(files['reference']))),
+        ('ini-save', referenceIni.getItemsCount(), lambda: referenceIni.saveToIniFile(os.path.join(tempDir, 'output.ini'))),
+        ('xlsx-load', originalIni.getItemsCount(), quietly(lambda: LocalizationIni.FromXlsxFiles(files['xlsx'], 'global.ini', 2, splitDocuments))),
+        ('xliff-load', originalIni.getItemsCount(), lambda: LocalizationIni.FromXliffFile(files['xliff'])),
+        ('verify-loop', translationIni.getItemsCount(), verifyStage(dict(verifyOptions, backend='loop'), originalIni, translationIni)),
+        ('verify-columns', translationIni.getItemsCount(), verifyStage(dict(verifyOptions, backend='columns'), originalIni, translationIni)),
+        ('merge', referenceIni.getItemsCount(), mergeStage(referenceIni, originalIni, translationIni)),
+        ('transform', translationIni.getItemsCount(), transformStage(translationIni)),
+    ]
+    try:
+        stages.append(('transliterate', translationIni.getItemsCount(), transliterateStage(translationIni)))
+    except ImportError:
+        print('Note: transliterate package is not installed, transliterate stage is skipped')
+    return stages
+
+def compareResults(results, baseline, tolerance):
+    """Print comparison with baseline, returns number of regressed stages"""
+    if (baseline.get('keys'), baseline.get('seed')) != (results['keys'], results['seed']):
+        print(f'Warning: baseline data set differs (keys {baseline.get("keys")}, seed {baseline.get("seed")}), times are not comparable')
+    regressions = 0
+    print(f'Compare with baseline (tolerance {tolerance:.2f}x):')
+    for name, result in results['stages'].items():
+        baselineResult = baseline.get('stages', {}).get(name)
+        if baselineResult is None:
+            print(f'  {name:16}: {result["time"]:.3f}s, not in baseline')
+            continue
+        ratio = result['time'] / baselineResult['time']
+        status = ''
+        if ratio > tolerance:
+            status = ' SLOWER'
+            regressions += 1
+        elif ratio < 1 / tolerance:
+            status = ' faster'
+        print(f'  {name:16}: {baselineResult["time"]:.3f}s -> {result["time"]:.3f}s ({ratio:.2f}x){status}')
+    return regressions
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        startTime = time.perf_counter()
+        dataset = makeDataset(args.keys, args.seed)
+        files = writeDataset(tempDir, dataset)
+        print(f'Data set: {args.keys} keys, seed {args.seed}, generated in {time.perf_counter() - startTime:.2f}s')
+        results = {
+            'version': resultsVersion,
+            'keys': args.keys,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stages': {},
+        }
+        for name, itemsCount, function in getStages(files, list(dataset.splitDocuments), tempDir):
+            if args.stages and name not in args.stages:
+                continue
+            elapsed, result = measure(function, args.repeat)
+            results['stages'][name] = { 'time': round(elapsed, 6), 'items': itemsCount }
+            print(f'{name:16}: {elapsed:.3f}s ({itemsCount / elapsed:.0f} items/s)')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as outputFile:
+            json.dump(results, outputFile, indent=2)
+        print(f'Results: {args.output}')
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as inputFile:
+            baseline = json.load(inputFile)
+        if compareResults(results, baseline, args.tolerance) > 0:
+            print('Error: some stages are slower than baseline')
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark pipeline stages on synthetic data set', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in synthetic data set')
+    parser.add_argument('-s', '--seed', type=int, default=1, help='Seed of synthetic data set')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of measurements of each stage (best is reported)')
+    parser.add_argument('--stages', nargs='+', metavar='STAGE', default=None, help='Run only these stages')
+    parser.add_argument('-o', '--output', metavar='JSON_FILENAME', default=None, help='Write results to JSON file')
+    parser.add_argument('-b', '--baseline', metavar='JSON_FILENAME', default=None, help='Compare results with baseline JSON file written by earlier run')
+    parser.add_argument('-t', '--tolerance', type=float, default=1.25, help='Slowdown ratio above which stage is reported as regression')
+    sys.exit(main(parser.parse_args()))
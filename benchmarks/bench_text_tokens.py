@@ -0,0 +1,55 @@
+#!/usr/bin/python
+
+# Per key benchmark of verifier text checks: separate scans and replaces vs single tokenizer pass
+
+import os
+import re
+import sys
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+from timing import measure
+
+lostNewlineExpr = re.compile(r'[^\\]\\[^n\\]')
+spaceBeforeNewlineExpr = re.compile(r' \\n')
+
+def legacyChain(value):
+    unnamedFormats = LocalizationIni.GetUnnamedFormats(value)
+    namedFormats = LocalizationIni.GetNamedFormats(value)
+    lostNewlineCount = len(lostNewlineExpr.findall(value))
+    spaceBeforeNewlineCount = len(spaceBeforeNewlineExpr.findall(value))
+    englishWords = LocalizationIni.GetEnglishWords(LocalizationIni.GetCleanText(value, unnamedFormats, namedFormats))
+    return unnamedFormats, namedFormats, englishWords, lostNewlineCount, spaceBeforeNewlineCount
+
+def tokenizer(value):
+    tokens = LocalizationIni.GetTextTokens(value)
+    lostNewlineCount = len(lostNewlineExpr.findall(value)) if tokens.hasOtherEscape else 0
+    spaceBeforeNewlineCount = value.count(' \\n') if tokens.hasEscapedNewline else 0
+    return tokens.formats.unnamed, tokens.formats.named, tokens.englishWords, lostNewlineCount, spaceBeforeNewlineCount
+
+def measurePerValue(function, values, repeat):
+    def run():
+        for value in values:
+            function(value)
+    return measure(run, repeat)[0] / len(values) * 1000000
+
+def main(args):
+    for title, translated in (('source (English)', False), ('translation (Cyrillic)', True)):
+        values = [ value for key, value in makeIniItems(args.keys, translated=translated) ]
+        for value in values:
+            if legacyChain(value) != tokenizer(value):
+                print(f'Error: tokens mismatch: {value}')
+                return 1
+        legacyTime = measurePerValue(legacyChain, values, args.repeat)
+        tokenizerTime = measurePerValue(tokenizer, values, args.repeat)
+        print(f'{title}: {args.keys} keys')
+        print(f'  separate scans : {legacyTime:.2f} us/key')
+        print(f'  tokenizer      : {tokenizerTime:.2f} us/key ({legacyTime / tokenizerTime:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark single pass text tokenizer of verifier', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=50000, help='Number of keys')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of measurements, best is reported')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+
+# Benchmark LocalizationVerifier.verify: single process vs sharded worker pool
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+
+def measure(verifier, originalIni, translationIni, jobs):
+    output = io.StringIO()
+    startTime = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        verifier.verify(originalIni, translationIni, jobs)
+    return time.perf_counter() - startTime, output.getvalue()
+
+def main(args):
+    originalIni, translationIni = makeVerifyInis(args.keys)
+    with tempfile.TemporaryDirectory() as tempDir:
+        codepointsFile = os.path.join(tempDir, 'allowed_codepoints.txt')
+        writeCodepointsFile(codepointsFile, allowedCharacters())
+        options = { 'allowed_characters_file': codepointsFile, 'lost_newline': 'true', 'space_before_newline': 'true', 'english_words_mismatch': 'true' }
+        with contextlib.redirect_stdout(io.StringIO()):
+            verifier = LocalizationVerifier(options)
+        serialTime, serialOutput = measure(verifier, originalIni, translationIni, 1)
+        parallelTime, parallelOutput = measure(verifier, originalIni, translationIni, args.jobs)
+    if serialOutput != parallelOutput:
+        print('Error: verify output mismatch')
+        return 1
+    print(f'Keys: {args.keys}, report lines: {serialOutput.count(chr(10))}')
+    print(f'single process : {serialTime:.2f}s')
+    print(f'{args.jobs} jobs         : {parallelTime:.2f}s ({serialTime / parallelTime:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark sharded translation verification', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='Number of worker processes')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+
+# Benchmark LocalizationVerifier backends: per key loop vs column scans with per key checks of matched rows
+
+import io
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from modules.report import Report
+from synthetic import *
+
+def measure(options, originalIni, translationIni, reportFilename):
+    with contextlib.redirect_stdout(io.StringIO()):
+        verifier = LocalizationVerifier(options)
+    report = Report(False, reportFilename)
+    LocalizationVerifier.SetReport(report)
+    startTime = time.perf_counter()
+    verifier.verify(originalIni, translationIni)
+    elapsed = time.perf_counter() - startTime
+    report.close()
+    with open(reportFilename, 'rb') as reportFile:
+        return elapsed, reportFile.read()
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        codepointsFile = os.path.join(tempDir, 'allowed_codepoints.txt')
+        writeCodepointsFile(codepointsFile, allowedCharacters())
+        options = { 'allowed_characters_file': codepointsFile, 'lost_newline': 'true', 'space_before_newline': 'true', 'english_words_mismatch': 'true' }
+        for formatsRate in args.formats_rates:
+            originalIni, translationIni = makeVerifyInis(args.keys, formatsRate=formatsRate)
+            items = [ (key, value, translationIni.getKeyValue(key)) for key, value in originalIni.getItems() ]
+            with contextlib.redirect_stdout(io.StringIO()):
+                checkedRows = LocalizationVerifier(dict(options, backend='columns')).getCheckedRows(items)
+            loopTime, loopReport = measure(dict(options, backend='loop'), originalIni, translationIni, os.path.join(tempDir, 'loop.jsonl'))
+            columnsTime, columnsReport = measure(dict(options, backend='columns'), originalIni, translationIni, os.path.join(tempDir, 'columns.jsonl'))
+            if loopReport != columnsReport:
+                print('Error: verify findings mismatch')
+                return 1
+            print(f'Keys: {args.keys}, formats rate: {formatsRate}, rows checked per key: {len(checkedRows)} ({len(checkedRows) / args.keys * 100:.1f}%), findings: {loopReport.count(10) - 1}')
+            print(f'  loop    : {loopTime:.2f}s ({args.keys / loopTime:.0f} keys/s)')
+            print(f'  columns : {columnsTime:.2f}s ({args.keys / columnsTime:.0f} keys/s, {loopTime / columnsTime:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark verify backends', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys')
+    parser.add_argument('-f', '--formats-rates', type=float, nargs='+', default=[ 0.15, 0.02 ], help='Probability of format instead of word in generated values')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+# Load test of verify_server.py: requests per second and latency of each request type with local keep-alive clients
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.client
+import urllib.parse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from synthetic import *
+
+scriptFilename = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'verify_server.py')
+
+def startServer(tempDir):
+    """Start server on free port in data set directory, returns process and port"""
+    command = [ sys.executable, scriptFilename, '-r', 'global_ref.ini', '-a', 'allowed_codepoints.txt', '-p', '0' ]
+    process = subprocess.Popen(command, cwd=tempDir, stdout=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        if line.startswith('Listening on'):
+            return process, int(line.split()[2].rsplit(':', 1)[1])
+    process.wait()
+    raise Exception('Server did not start')
+
+def getRequests(dataset, count):
+    translations = dict(dataset.translatedItems)
+    keys = [ key for key, value in dataset.referenceItems ]
+    verifyKeys = [ key for key in keys if key in translations ]
+    return {
+        'verify': [ ('POST', '/verify', json.dumps({ 'key': key, 'translation': translations[key] }, ensure_ascii=False).encode('utf-8'))
+                    for key in (verifyKeys[i % len(verifyKeys)] for i in range(count)) ],
+        'placeholders': [ ('GET', '/placeholders?' + urllib.parse.urlencode({ 'key': keys[i % len(keys)] }), None) for i in range(count) ],
+        'key': [ ('GET', '/key?' + urllib.parse.urlencode({ 'key': keys[i % len(keys)] }), None) for i in range(count) ],
+    }
+
+def runClient(port, requests, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = { 'Content-Type': 'application/json' }
+    for method, path, body in requests:
+        startTime = time.perf_counter()
+        connection.request(method, path, body, headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - startTime)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+def measure(port, requests, clients):
+    latencies = []
+    errors = []
+    threads = [ threading.Thread(target=runClient, args=(port, requests[index::clients], latencies, errors)) for index in range(clients) ]
+    startTime = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - startTime
+    latencies.sort()
+    return elapsed, latencies, errors
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        dataset = makeDataset(args.keys, args.seed)
+        writeDataset(tempDir, dataset)
+        startTime = time.perf_counter()
+        process, port = startServer(tempDir)
+        print(f'Data set: {args.keys} keys, server ready in {time.perf_counter() - startTime:.2f}s')
+        try:
+            for name, requests in getRequests(dataset, args.requests).items():
+                # warm up connection and server caches
+                measure(port, requests[:100], 1)
+                elapsed, latencies, errors = measure(port, requests, args.clients)
+                if errors:
+                    print(f'Error: {name} requests failed with status {sorted(set(errors))}')
+                    return 1
+                print(f'{name:14}: {len(requests) / elapsed:.0f} requests/s, latency p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, '
+                      f'p99 {latencies[len(latencies) * 99 // 100] * 1000:.2f} ms ({args.clients} clients)')
+        finally:
+            process.terminate()
+            process.wait()
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test of verify server', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in synthetic data set')
+    parser.add_argument('-s', '--seed', type=int, default=1, help='Seed of synthetic data set')
+    parser.add_argument('-n', '--requests', type=int, default=5000, help='Number of requests of each type')
+    parser.add_argument('-c', '--clients', type=int, default=1, help='Number of concurrent client connections')
+    sys.exit(main(parser.parse_args()))
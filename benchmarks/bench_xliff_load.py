@@ -0,0 +1,62 @@
+#!/usr/bin/python
+
+# Benchmark XLIFF loading: ElementTree DOM loader vs streaming LocalizationIni.FromXliffFile
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+import collections
+import xml.etree.cElementTree as ET
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+
+def legacyLoadFromXliffFile(filename):
+    source_data = collections.OrderedDict()
+    target_data = collections.OrderedDict()
+    tree = ET.ElementTree(file=filename)
+    root = tree.getroot()
+    ns = {'xliff': root.tag.split('}', 1)[0][1:]}
+    trans_units = root.findall('.//xliff:trans-unit', namespaces=ns)
+    for trans_unit in trans_units:
+        key = trans_unit.get('resname')
+        translate = trans_unit.get('translate')
+        source_value = trans_unit.find('xliff:source', namespaces=ns)
+        target_value =  trans_unit.find('xliff:target', namespaces=ns)
+        source_data[key] = '' if source_value.text is None else source_value.text
+        if translate == 'no' or target_value.get('state') == 'final':
+            target_data[key] = '' if target_value.text is None else target_value.text
+    return [ source_data, target_data ]
+
+def measure(function):
+    startTime = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - startTime
+    tracemalloc.start()
+    function()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tempDir:
+        filename = os.path.join(tempDir, 'global.ini.xliff')
+        writeXliffFile(filename, makeIniItems(args.keys), makeIniItems(args.keys, translated=True))
+        legacyTime, legacyPeak, legacyData = measure(lambda: legacyLoadFromXliffFile(filename))
+        streamTime, streamPeak, streamInis = measure(lambda: LocalizationIni.FromXliffFile(filename))
+        for data, ini in zip(legacyData, streamInis):
+            if list(data.items()) != list(ini.getItems()):
+                print('Error: loaded data mismatch')
+                return 1
+        print(f'Keys: {args.keys} ({os.path.getsize(filename) / 1048576:.1f} MiB)')
+        print(f'DOM loader      : {legacyTime:.2f}s, peak traced {legacyPeak / 1048576:.1f} MiB')
+        print(f'streaming loader: {streamTime:.2f}s, peak traced {streamPeak / 1048576:.1f} MiB ({legacyTime / streamTime:.2f}x time, {legacyPeak / streamPeak:.2f}x memory)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark XLIFF loading', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of trans-units in synthetic XLIFF file')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,52 @@
+#!/usr/bin/python
+
+# Benchmark loading of main and split XLSX documents: serial vs process pool
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from synthetic import *
+
+def writeDocument(filename, sheetName, items, translatedItems):
+    outputXlsx = MultiLangXlsx.Create(filename, sheetName, 'uk')
+    for (key, value), (translateKey, translateValue) in zip(items, translatedItems):
+        outputXlsx.append(key, value, translateValue)
+    outputXlsx.close()
+
+def measure(filename, splitDocuments, jobs):
+    LocalizationIni.SetLoadJobs(jobs)
+    startTime = time.perf_counter()
+    result = LocalizationIni.FromXlsxFiles(filename, 'global.ini', 2, splitDocuments)
+    return time.perf_counter() - startTime, result
+
+def main(args):
+    items = makeIniItems(args.keys)
+    translatedItems = makeIniItems(args.keys, translated=True)
+    documentsCount = args.documents + 1
+    with tempfile.TemporaryDirectory() as tempDir:
+        filename = os.path.join(tempDir, 'global.ini.xlsx')
+        splitDocuments = [ f'split{i}' for i in range(args.documents) ]
+        for i, sheetName in enumerate([ 'global.ini' ] + splitDocuments):
+            documentFilename = filename if i == 0 else os.path.join(tempDir, sheetName + '.xlsx')
+            writeDocument(documentFilename, sheetName, items[i::documentsCount], translatedItems[i::documentsCount])
+        serialTime, serialResult = measure(filename, splitDocuments, 1)
+        parallelTime, parallelResult = measure(filename, splitDocuments, args.jobs)
+        for serialIni, parallelIni in zip(serialResult, parallelResult):
+            if list(serialIni.getItems()) != list(parallelIni.getItems()):
+                print('Error: loaded data mismatch')
+                return 1
+        print(f'Keys: {args.keys} in {documentsCount} documents')
+        print(f'serial         : {serialTime:.2f}s')
+        print(f'{args.jobs} jobs         : {parallelTime:.2f}s ({serialTime / parallelTime:.2f}x)')
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark parallel loading of split XLSX documents', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in all documents')
+    parser.add_argument('-d', '--documents', type=int, default=4, help='Number of split documents')
+    parser.add_argument('-j', '--jobs', type=int, default=max(2, os.cpu_count() or 1), help='Number of worker processes')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+
+# Benchmark XLSX writing: pandas DataFrame path vs streaming MultiLangXlsx
+# Each writer runs in own process to measure its peak RSS (Unix only)
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from modules.xlsx import XlsxReader
+from synthetic import *
+
+def makeReferenceAndTranslation(keys):
+    referenceIni = LocalizationIni.Empty()
+    translateIni = LocalizationIni.Empty()
+    for (key, value), (translateKey, translateValue) in zip(makeIniItems(keys), makeIniItems(keys, translated=True)):
+        referenceIni.putKeyValue(key, value)
+        translateIni.putKeyValue(key, translateValue)
+    return referenceIni, translateIni
+
+def writeDataFrame(filename, referenceIni, translateIni):
+    import pandas
+    outputXlsx = MultiLangXlsx.Empty('uk')
+    for key, value in referenceIni.getItems():
+        outputXlsx.append(key, value, translateIni.getKeyValue(key))
+    dataFrame = pandas.DataFrame(outputXlsx.data, columns=[ 'A', 'B' ])
+    dataFrame.to_excel(filename, sheet_name='global.ini', index=False, header=False)
+
+def writeStream(filename, referenceIni, translateIni):
+    outputXlsx = MultiLangXlsx.Create(filename, 'global.ini', 'uk')
+    for key, value in referenceIni.getItems():
+        outputXlsx.append(key, value, translateIni.getKeyValue(key))
+    outputXlsx.close()
+
+def runChild(mode, filename, keys):
+    process = subprocess.Popen([ sys.executable, os.path.abspath(__file__), '--child', mode, '--keys', str(keys), filename ], stdout=subprocess.PIPE)
+    output = process.stdout.read()
+    pid, status, usage = os.wait4(process.pid, 0)
+    if status != 0:
+        return None
+    return float(output), usage.ru_maxrss / 1024
+
+def readRows(filename):
+    with XlsxReader(filename) as reader:
+        return [ row for rowNumber, row in reader.iterRows('global.ini') ]
+
+def main(args):
+    if args.child:
+        referenceIni, translateIni = makeReferenceAndTranslation(args.keys)
+        startTime = time.perf_counter()
+        if args.child == 'dataframe':
+            writeDataFrame(args.output, referenceIni, translateIni)
+        elif args.child == 'stream':
+            writeStream(args.output, referenceIni, translateIni)
+        print(time.perf_counter() - startTime)
+        return 0
+    with tempfile.TemporaryDirectory() as tempDir:
+        results = {}
+        baseline = runChild('input', os.path.join(tempDir, 'input.xlsx'), args.keys)
+        print(f'input data only: peak RSS {baseline[1]:.1f} MiB')
+        for mode in ('dataframe', 'stream'):
+            filename = os.path.join(tempDir, mode + '.xlsx')
+            results[mode] = runChild(mode, filename, args.keys)
+            if results[mode] is None:
+                print(f'{mode}: failed (pandas and openpyxl are required for dataframe mode)')
+            else:
+                print(f'{mode}: {results[mode][0]:.2f}s, peak RSS {results[mode][1]:.1f} MiB, size {os.path.getsize(filename) / 1048576:.1f} MiB')
+        if results['dataframe'] and results['stream']:
+            if readRows(os.path.join(tempDir, 'dataframe.xlsx')) != readRows(os.path.join(tempDir, 'stream.xlsx')):
+                print('Error: written cells mismatch')
+                return 1
+            print(f"Speedup: {results['dataframe'][0] / results['stream'][0]:.2f}x, RSS reduction: {results['dataframe'][1] / results['stream'][1]:.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark XLSX document writing', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('output', nargs='?', metavar='FILENAME', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('-k', '--keys', type=int, default=100000, help='Number of keys in synthetic document')
+    parser.add_argument('--child', choices=[ 'input', 'dataframe', 'stream' ], default=None, help=argparse.SUPPRESS)
+    sys.exit(main(parser.parse_args()))
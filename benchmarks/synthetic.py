@@ -0,0 +1,169 @@
+# Synthetic localization data used by benchmarks
+
+import random
+import collections
+
+__words = ['Contract', 'cargo', 'Hangar', 'Quantum', 'drive', 'station', 'mission', 'Crusader', 'ship', 'armor']
+__translatedWords = ['Контракт', 'вантаж', 'Ангар', 'Квантовий', 'двигун', 'станція', 'місія', 'Крусейдер', 'корабель', 'броня']
+__formats = ['%ls', '%s', '%d', '%.1f', '<EM4>', '</EM4>', '~mission(Contractor|SignalText)', '~mission(Location)', '\\n']
+
+def makeValue(rnd, words, wordsCount, formatsRate=0.15):
+    parts = []
+    for i in range(wordsCount):
+        if rnd.random() < formatsRate:
+            parts.append(rnd.choice(__formats))
+        else:
+            parts.append(rnd.choice(words))
+    return ' '.join(parts)
+
+def makeIniItems(count, seed=1, translated=False, formatsRate=0.15):
+    rnd = random.Random(seed)
+    words = __translatedWords if translated else __words
+    items = []
+    for i in range(count):
+        items.append((f'key_{i}_{rnd.randrange(1 << 30):x}', makeValue(rnd, words, rnd.randint(1, 24), formatsRate)))
+    return items
+
+def writeIniFile(filename, items):
+    with open(filename, 'w', encoding='utf-8', newline='') as outputFile:
+        outputFile.write('\ufeff')
+        for key, value in items:
+            outputFile.write(f'{key}={value}\r\n')
+
+def writeXliffFile(filename, items, translatedItems):
+    from xml.sax.saxutils import escape, quoteattr
+    with open(filename, 'w', encoding='utf-8') as outputFile:
+        outputFile.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        outputFile.write('<xliff xmlns="urn:oasis:names:tc:xliff:document:1.2" version="1.2">\n')
+        outputFile.write('<file original="global.ini" source-language="en" target-language="uk" datatype="plaintext"><body>\n')
+        for index, ((key, value), (translateKey, translateValue)) in enumerate(zip(items, translatedItems)):
+            state = 'final' if index % 4 else 'translated'
+            translate = ' translate="no"' if index % 97 == 0 else ''
+            outputFile.write(f'<trans-unit id="{index}" resname={quoteattr(key)}{translate}>'
+                             f'<source>{escape(value)}</source><target state="{state}">{escape(translateValue)}</target></trans-unit>\n')
+        outputFile.write('</body></file>\n</xliff>\n')
+
+def writeCodepointsFile(filename, characters):
+    with open(filename, 'w', encoding='utf-8', newline='') as outputFile:
+        for character in characters:
+            outputFile.write(f'\\u{ord(character):04x}')
+
+def allowedCharacters():
+    return ''.join(chr(code) for code in range(0x21, 0x7f)) + 'АБВГҐДЕЄЖЗИІЇЙКЛМНОПРСТУФХЦЧШЩЬЮЯабвгґдеєжзиіїйклмнопрстуфхцчшщьюя’«»—…'
+
+def makeVerifyInis(count, seed=1, formatsRate=0.15):
+    from modules.localization import LocalizationIni
+    items = makeIniItems(count, seed, formatsRate=formatsRate)
+    translatedItems = makeIniItems(count, seed, translated=True, formatsRate=formatsRate)
+    originalIni = LocalizationIni(collections.OrderedDict(items))
+    translationIni = LocalizationIni(collections.OrderedDict((key, translateValue) for (key, value), (translateKey, translateValue) in zip(items, translatedItems)))
+    return originalIni, translationIni
+
+# realistic data set: keys of main and split documents, inner thought keys,
+# translations which keep formats of source and reference of newer game build
+
+__mainPrefixes = ['mobiGlas_ui_', 'Contract_', 'Desc_', 'pause_', 'ui_', 'Location_']
+__splitPrefixes = {
+    'names': ['item_Name', 'vehicle_Name'],
+    'subtitles': ['Dlg_', 'Pacheco_'],
+    'garbage': ['test_', 'DXSM_'],
+}
+__innerThoughtPrefixes = ['interaction_', 'BarMenu_', 'Hints_Interaction_Condition_', 'vehicle_interactor_']
+
+Dataset = collections.namedtuple('Dataset', [ 'referenceItems', 'originalItems', 'translatedItems', 'splitDocuments', 'innerThoughtPrefixes' ])
+
+def makeTokens(rnd, formatsRate):
+    tokens = []
+    for i in range(rnd.randint(1, 24)):
+        if rnd.random() < formatsRate:
+            tokens.append(rnd.choice(__formats))
+        else:
+            tokens.append(rnd.randrange(len(__words)))
+    return tokens
+
+def makeTokensValue(tokens, words):
+    return ' '.join(token if isinstance(token, str) else words[token] for token in tokens)
+
+def makeDataset(count, seed=1, formatsRate=0.15, translatedRate=0.9, changedRate=0.05, errorsRate=0.02):
+    """Deterministic original, translation and reference items of count keys
+
+    About a quarter of keys belong to split documents and a tenth are inner
+    thought keys. Translations use Cyrillic words and keep formats of source
+    except errorsRate of them. Reference has changedRate of values changed,
+    some keys removed and new keys added.
+    """
+    rnd = random.Random(seed)
+    splitPrefixes = [ prefix for prefixes in __splitPrefixes.values() for prefix in prefixes ]
+    originalItems = []
+    translatedItems = []
+    referenceItems = []
+    for i in range(count):
+        kind = rnd.random()
+        if kind < 0.25:
+            prefix = rnd.choice(splitPrefixes)
+        elif kind < 0.35:
+            prefix = rnd.choice(__innerThoughtPrefixes)
+        else:
+            prefix = rnd.choice(__mainPrefixes)
+        key = f'{prefix}{__words[rnd.randrange(len(__words))]}_{i}'
+        tokens = makeTokens(rnd, formatsRate)
+        value = makeTokensValue(tokens, __words)
+        originalItems.append((key, value))
+        if rnd.random() < translatedRate:
+            translatedTokens = [ token for token in tokens if not (isinstance(token, str) and rnd.random() < errorsRate) ]
+            translatedItems.append((key, makeTokensValue(translatedTokens, __translatedWords)))
+        change = rnd.random()
+        if change < changedRate:
+            referenceItems.append((key, makeTokensValue(makeTokens(rnd, formatsRate), __words)))
+        elif change < changedRate + 0.01:
+            referenceItems.append((f'{key}_new', value))
+        elif change >= 0.99:
+            # key removed from newer game build
+            continue
+        else:
+            referenceItems.append((key, value))
+    return Dataset(referenceItems, originalItems, translatedItems, dict(__splitPrefixes), list(__innerThoughtPrefixes))
+
+def writeMultilangXlsxFiles(filename, dataset):
+    """Write main and split XLSX documents of data set, returns split document names"""
+    import os
+    from modules.localization import MultiLangXlsx, PrefixMatcher
+    documentsPath = os.path.dirname(os.path.abspath(filename))
+    matcher = PrefixMatcher([ (prefix, name) for name, prefixes in dataset.splitDocuments.items() for prefix in prefixes ])
+    documents = { None: MultiLangXlsx.Create(filename, 'global.ini', 'uk') }
+    for name in dataset.splitDocuments:
+        documents[name] = MultiLangXlsx.Create(os.path.join(documentsPath, name + '.xlsx'), name, 'uk')
+    translations = dict(dataset.translatedItems)
+    for key, value in dataset.originalItems:
+        documents[matcher.match(key)].append(key, value, translations.get(key))
+    for document in documents.values():
+        document.close()
+    return list(dataset.splitDocuments)
+
+def writeDataset(directory, dataset):
+    """Write data set as INI, XLSX and XLIFF files with convert config, returns dict of file names"""
+    import os
+    files = {
+        'reference': os.path.join(directory, 'global_ref.ini'),
+        'original': os.path.join(directory, 'global.ini.original'),
+        'translation': os.path.join(directory, 'global.ini.translation'),
+        'xlsx': os.path.join(directory, 'global.ini.xlsx'),
+        'xliff': os.path.join(directory, 'global.ini.xliff'),
+        'convert': os.path.join(directory, 'convert.ini'),
+        'inner_thought': os.path.join(directory, 'inner_throught_keys.txt'),
+        'allowed_codepoints': os.path.join(directory, 'allowed_codepoints.txt'),
+    }
+    writeIniFile(files['reference'], dataset.referenceItems)
+    writeIniFile(files['original'], dataset.originalItems)
+    writeIniFile(files['translation'], dataset.translatedItems)
+    writeMultilangXlsxFiles(files['xlsx'], dataset)
+    translations = dict(dataset.translatedItems)
+    writeXliffFile(files['xliff'], dataset.originalItems, [ (key, translations.get(key, '')) for key, value in dataset.originalItems ])
+    with open(files['convert'], 'w', encoding='utf-8') as outputFile:
+        outputFile.write('[verify]\nlost_newline = true\nspace_before_newline = true\nenglish_words_mismatch = true\n\n[split-documents]\n')
+        for name, prefixes in dataset.splitDocuments.items():
+            outputFile.write(f'{name} = {", ".join(prefixes)}\n')
+    with open(files['inner_thought'], 'w', encoding='utf-8') as outputFile:
+        outputFile.write(''.join(f'+{prefix}\n' for prefix in dataset.innerThoughtPrefixes))
+    writeCodepointsFile(files['allowed_codepoints'], allowedCharacters())
+    return files
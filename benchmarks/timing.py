@@ -0,0 +1,15 @@
+# Timing helpers shared by benchmarks
+
+import time
+
+def measure(function, repeat):
+    """Run function repeat times, returns best elapsed time and result of last run"""
+    best = None
+    result = None
+    for i in range(repeat):
+        startTime = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - startTime
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
@@ -6,11 +6,16 @@ import os
 import sys
 import pathlib
 import argparse
+import contextlib
 import configparser
 from modules.localization import * 
+from modules.profiler import Profiler
+from modules.xlsx import XlsxWriter
 
 
 def main(args):
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
     try:
         print("Convert ini to xsls: {0} -> {1}".format(args.input, args.output))
         config = configparser.ConfigParser()
@@ -23,25 +28,38 @@ def main(args):
         if not args.no_split and 'split-documents' in config:
             print("Split ini...")
             split = splitConfig(config['split-documents'])
-            mainIni = LocalizationIni.Empty()
-            splitInis = {}
+            outPath = pathlib.Path(args.output).parent.absolute()
+            documents = [ (args.output, 'global.ini') ]
             for splitFile in split.files:
-                splitInis[splitFile] = LocalizationIni.Empty()
-            for item in inputIni.getItems():
-                keyFile = split.searchKeyFile(item[0])
-                if keyFile:
-                    splitInis[keyFile].putKeyValue(item[0], item[1])
+                documents.append((os.path.join(outPath, splitFile + ".xlsx"), splitFile))
+            # on error or interrupt partially written documents are deleted
+            with contextlib.ExitStack() as xlsxStack:
+                xlsxDocs = []
+                for filename, sheetName in documents:
+                    if args.jobs > 1:
+                        xlsxDoc = []
+                    else:
+                        print(f'Write output {filename}...')
+                        xlsxDoc = xlsxStack.enter_context(XlsxWriter(filename, sheetName))
+                    xlsxDoc.append([ 'en' ])
+                    xlsxDocs.append(xlsxDoc)
+                mainXlsx = xlsxDocs[0]
+                splitXlsxDocs = dict(zip(split.files, xlsxDocs[1:]))
+                for key, value in inputIni.getItems():
+                    keyFile = split.searchKeyFile(key)
+                    if keyFile:
+                        splitXlsxDocs[keyFile].append([ LocalizationIni.GetKeyValueText(key, value) ])
+                    else:
+                        mainXlsx.append([ LocalizationIni.GetKeyValueText(key, value) ])
+                if args.jobs > 1:
+                    print(f'Write output documents on {args.jobs} workers...')
+                    results = XlsxWriter.WriteFiles([ (filename, sheetName, xlsxDoc) for (filename, sheetName), xlsxDoc in zip(documents, xlsxDocs) ], args.jobs)
+                    for (filename, sheetName), (rowsCount, elapsed) in zip(documents, results):
+                        print(f'Written lines {os.path.basename(filename)}: {rowsCount - 1} ({elapsed:.2f}s)')
                 else:
-                    mainIni.putKeyValue(item[0], item[1])
-            print(f'Write output main {args.output}...')
-            mainIni.saveToXlsxFile(args.output, 'global.ini')
-            print(f'Written lines: {mainIni.getItemsCount()}')
-            outPath = pathlib.Path(args.output).parent.absolute()
-            for splitFile in splitInis:
-                splitIni = splitInis[splitFile]
-                print(f"Write output split {splitFile}.xlsx...")
-                splitIni.saveToXlsxFile(os.path.join(outPath, splitFile + ".xlsx"), splitFile)
-                print(f"Written lines: {splitIni.getItemsCount()}")
+                    for (filename, sheetName), xlsxDoc in zip(documents, xlsxDocs):
+                        xlsxDoc.close()
+                        print(f'Written lines {os.path.basename(filename)}: {len(xlsxDoc) - 1}')
         else:
             print("Write output xlsx...")
             inputIni.saveToXlsxFile(args.output, "global.ini")
@@ -52,6 +70,9 @@ def main(args):
     except Exception as err:
         print("Error: {0}".format(err))
         return 1
+    finally:
+        if args.profile:
+            Profiler.Save(args.profile)
     print('Done')
     return 0
 
@@ -60,6 +81,9 @@ if __name__ == "__main__":
     parser.add_argument('input', nargs='?', metavar='FILENAME', default='global.ini', help='Input INI file')
     parser.add_argument('-o', '--output', metavar='OUT_FILENAME', default='global.ini.xlsx', help='Directs the output to a file name of your choice')
     parser.add_argument('-l', '--lang', metavar='LANGUAGE', default='uk', help='Input file language locale')
+    parser.add_argument('-j', '--jobs', metavar='N', type=int, default=1, help='Number of worker processes used to write split documents (rows of all documents are then kept in memory)')
     parser.add_argument('--no-split', action='store_true', default=False, help='Disable split output XLSX document')
     parser.add_argument('--no-errors', action='store_true', default=False, help='Do not allow errors and break after first error')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of stages and write summary to JSON file')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-ini, save-xlsx, close-xlsx) and dump it next to profile summary')
     sys.exit(main(parser.parse_args()))
@@ -2,14 +2,20 @@
 
 # Convert global.ini => global.ini.xlsx
 
+import os
 import sys
 import pathlib
 import argparse
+import contextlib
 import configparser
 from modules.localization import * 
+from modules.profiler import Profiler
+from modules.xlsx import XlsxWriter
 
 
 def main(args):
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
     try:
         print(f'Convert ini to xlsx (with ref {args.ref}): {args.input} -> {args.output}')
         config = configparser.ConfigParser()
@@ -24,36 +30,47 @@ def main(args):
         if not args.no_split and 'split-documents' in config:
             print("Split ini...")
             split = splitConfig(config['split-documents'])
-            mainXlsx = MultiLangXlsx.Empty(args.lang)
-            mainXlsx.setAutoMarkEmptyAsTranslated(True)
-            splitXlsxDocs = {}
+            outPath = pathlib.Path(args.output).parent.absolute()
+            documents = [ (args.output, 'global.ini') ]
             for splitFile in split.files:
-                splitXlsxDocs[splitFile] = MultiLangXlsx.Empty(args.lang)
-                splitXlsxDocs[splitFile].setAutoMarkEmptyAsTranslated(True)
-            for key, value in referenceIni.getItems():
-                translateValue = inputIni.getKeyValue(key)
-                if args.all_keys or translateValue:
-                    keyFile = split.searchKeyFile(key)
-                    if keyFile:
-                        splitXlsxDocs[keyFile].append(key, value, translateValue)
+                documents.append((os.path.join(outPath, splitFile + ".xlsx"), splitFile))
+            # on error or interrupt partially written documents are deleted
+            with contextlib.ExitStack() as xlsxStack:
+                xlsxDocs = []
+                for filename, sheetName in documents:
+                    if args.jobs > 1:
+                        xlsxDoc = MultiLangXlsx.Empty(args.lang)
                     else:
-                        mainXlsx.append(key, value, translateValue)
-            print(f'Write output main {args.output}...')
-            mainXlsx.saveToXlsxFile(args.output, 'global.ini')
-            print(f'Written lines: {mainXlsx.getItemsCount()}')
-            outPath = pathlib.Path(args.output).parent.absolute()
-            for splitFile, splitXlsx in splitXlsxDocs.items():
-                print(f'Write output split {splitFile}.xlsx...')
-                splitXlsx.saveToXlsxFile(os.path.join(outPath, splitFile + ".xlsx"), splitFile)
-                print(f'Written lines: {splitXlsx.getItemsCount()}')
+                        print(f'Write output {filename}...')
+                        xlsxDoc = xlsxStack.enter_context(MultiLangXlsx.Create(filename, sheetName, args.lang))
+                    xlsxDoc.setAutoMarkEmptyAsTranslated(True)
+                    xlsxDocs.append(xlsxDoc)
+                mainXlsx = xlsxDocs[0]
+                splitXlsxDocs = dict(zip(split.files, xlsxDocs[1:]))
+                for key, value in referenceIni.getItems():
+                    translateValue = inputIni.getKeyValue(key)
+                    if args.all_keys or translateValue:
+                        keyFile = split.searchKeyFile(key)
+                        if keyFile:
+                            splitXlsxDocs[keyFile].append(key, value, translateValue)
+                        else:
+                            mainXlsx.append(key, value, translateValue)
+                if args.jobs > 1:
+                    print(f'Write output documents on {args.jobs} workers...')
+                    results = XlsxWriter.WriteFiles([ (filename, sheetName, xlsxDoc.data) for (filename, sheetName), xlsxDoc in zip(documents, xlsxDocs) ], args.jobs)
+                    for (filename, sheetName), (rowsCount, elapsed) in zip(documents, results):
+                        print(f'Written lines {os.path.basename(filename)}: {rowsCount - 1} ({elapsed:.2f}s)')
+                else:
+                    for (filename, sheetName), xlsxDoc in zip(documents, xlsxDocs):
+                        xlsxDoc.close()
+                        print(f'Written lines {os.path.basename(filename)}: {xlsxDoc.getItemsCount()}')
         else:
             print('Write output xlsx...')
-            outputXlsx = MultiLangXlsx.Empty(args.lang)
-            for key, value in referenceIni.getItems():
-                translateValue = inputIni.getKeyValue(key)
-                if args.all_keys or translateValue:
-                    outputXlsx.append(key, value, translateValue)
-            outputXlsx.saveToXlsxFile(args.output, args.input)
+            with MultiLangXlsx.Create(args.output, args.input, args.lang) as outputXlsx:
+                for key, value in referenceIni.getItems():
+                    translateValue = inputIni.getKeyValue(key)
+                    if args.all_keys or translateValue:
+                        outputXlsx.append(key, value, translateValue)
             print(f'Written lines: {outputXlsx.getItemsCount()}')
     except KeyboardInterrupt:
         print('Interrupted')
@@ -61,6 +78,9 @@ def main(args):
     except Exception as err:
         print('Error: {0}'.format(err))
         return 1
+    finally:
+        if args.profile:
+            Profiler.Save(args.profile)
     print('Done')
     return 0
 
@@ -71,6 +91,9 @@ if __name__ == "__main__":
     parser.add_argument('-r', '--ref', metavar='REF_FILENAME', default='global_ref.ini', help='Reference game global.ini');
     parser.add_argument('-l', '--lang', metavar='LANGUAGE', default='uk', help='Input file language locale')
     parser.add_argument('--all-keys', metavar='ENABLED', type=bool, default=True, help='Add all keys from reference ini even they not translated')
+    parser.add_argument('-j', '--jobs', metavar='N', type=int, default=1, help='Number of worker processes used to write split documents (rows of all documents are then kept in memory)')
     parser.add_argument('--no-split', action='store_true', default=False, help='Disable split output XLSX document')
     parser.add_argument('--no-errors', action='store_true', default=False, help='Do not allow errors and break after first error')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of stages and write summary to JSON file')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-ini, save-xlsx, close-xlsx) and dump it next to profile summary')
     sys.exit(main(parser.parse_args()))
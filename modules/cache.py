@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+
+class ParseCache:
+    """On-disk cache of parsed input files
+
+    Entries are addressed by content hash of the input file together with
+    loader name and loader parameters, so renamed or touched files still hit
+    and any content change misses. Digest of loader sources is part of the
+    address too, so entries parsed by older loader code are not served after
+    the code changes. Parsed data is stored with pickle. Least recently used
+    entries are evicted when the cache directory grows above the size limit.
+    """
+
+    # 2: XLSX cell text with decoded _xHHHH_ escapes
+    __formatVersion = 2
+    __suffix = '.cache'
+    # modules which produce cached data
+    __loaderFilenames = [ 'localization.py', 'storage.py', 'xlsx.py' ]
+
+    @staticmethod
+    def DefaultDirectory():
+        directory = os.environ.get('SC_LOCALIZATION_CACHE_DIR')
+        if directory:
+            return directory
+        return os.path.join(os.path.expanduser('~'), '.cache', 'sc-localization-scripts')
+
+    @staticmethod
+    def GetFileHash(filename):
+        fileHash = hashlib.sha256()
+        with open(filename, 'rb') as inputFile:
+            while True:
+                chunk = inputFile.read(1 << 20)
+                if not chunk:
+                    break
+                fileHash.update(chunk)
+        return fileHash.hexdigest()
+
+    @staticmethod
+    def GetLoaderDigest(filenames=None):
+        """Digest of loader sources, default are loader modules next to this one"""
+        if filenames is None:
+            modulesPath = os.path.dirname(os.path.abspath(__file__))
+            filenames = [ os.path.join(modulesPath, filename) for filename in ParseCache.__loaderFilenames ]
+        digest = hashlib.sha256()
+        for filename in filenames:
+            digest.update(f'|{ParseCache.GetFileHash(filename)}'.encode('ascii'))
+        return digest.hexdigest()
+
+    def __init__(self, directory, maxSize=512 * 1024 * 1024, loaderFilenames=None):
+        self.directory = directory
+        self.maxSize = maxSize
+        self.loaderDigest = ParseCache.GetLoaderDigest(loaderFilenames)
+        self.hits = 0
+        self.misses = 0
+
+    def getKey(self, filename, loaderName, params):
+        keyHash = hashlib.sha256()
+        keyHash.update(f'{ParseCache.__formatVersion}|{self.loaderDigest}|{loaderName}|{params!r}|'.encode('utf-8'))
+        keyHash.update(ParseCache.GetFileHash(filename).encode('ascii'))
+        return keyHash.hexdigest()
+
+    def __getPath(self, key):
+        return os.path.join(self.directory, key + ParseCache.__suffix)
+
+    def get(self, key):
+        path = self.__getPath(key)
+        try:
+            with open(path, 'rb') as inputFile:
+                data = pickle.load(inputFile)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tempPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as outputFile:
+                    pickle.dump(data, outputFile, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tempPath, self.__getPath(key))
+            except:
+                os.remove(tempPath)
+                raise
+            self.__evict()
+        except OSError as err:
+            print(f'Note: parse cache is not updated: {err}')
+
+    def __evict(self):
+        entries = []
+        totalSize = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(ParseCache.__suffix):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    totalSize += stat.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if totalSize <= self.maxSize:
+                break
+            os.remove(path)
+            totalSize -= size
+
+class VerdictCache:
+    """On-disk cache of translation verification findings
+
+    Findings are stored per verified item under a digest of key, source value
+    and translation value. One file keeps all items of one scope (usually
+    output file) verified with one set of verifier options, the file name is
+    derived from scope and options digest. Each save keeps only items of the
+    last run, so removed keys do not accumulate. With refresh enabled stored
+    findings are ignored and replaced by a full re-check.
+    """
+
+    __formatVersion = 1
+    __suffix = '.cache'
+
+    @staticmethod
+    def GetItemDigest(key, value, translateValue):
+        return hashlib.blake2b(f'{key}\0{value}\0{translateValue}'.encode('utf-8'), digest_size=16).digest()
+
+    def __init__(self, directory, scope, refresh=False):
+        self.directory = directory
+        self.scope = scope
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+
+    def __getPath(self, optionsDigest):
+        nameHash = hashlib.sha256(f'{VerdictCache.__formatVersion}|{self.scope}|{optionsDigest}'.encode('utf-8'))
+        return os.path.join(self.directory, 'verdicts-' + nameHash.hexdigest() + VerdictCache.__suffix)
+
+    def load(self, optionsDigest):
+        if self.refresh:
+            return {}
+        try:
+            with open(self.__getPath(optionsDigest), 'rb') as inputFile:
+                return pickle.load(inputFile)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return {}
+
+    def save(self, optionsDigest, verdicts):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tempPath = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as outputFile:
+                    pickle.dump(verdicts, outputFile, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tempPath, self.__getPath(optionsDigest))
+            except:
+                os.remove(tempPath)
+                raise
+        except OSError as err:
+            print(f'Note: verdict cache is not updated: {err}')
+
+class BuildManifest:
+    """Record of inputs and output of builds of one output file
+
+    Manifest is JSON file next to output. Each build step writing the output
+    keeps own record with digest of its input files and options and hash of
+    written output. Step is up to date when digest of its inputs is the same
+    and output still has recorded hash. Output changed in place by following
+    step is accepted too, when that step recorded output of this step as its
+    input.
+    """
+
+    __formatVersion = 1
+    __suffix = '.manifest.json'
+
+    @staticmethod
+    def GetInputsDigest(filenames, options):
+        digest = hashlib.sha256()
+        digest.update(f'{BuildManifest.__formatVersion}|{options!r}'.encode('utf-8'))
+        for filename in filenames:
+            # position of file is part of digest, path is not
+            fileHash = ParseCache.GetFileHash(filename) if os.path.isfile(filename) else 'missing'
+            digest.update(f'|{fileHash}'.encode('ascii'))
+        return digest.hexdigest()
+
+    def __init__(self, outputFilename, step, inputsDigest):
+        self.outputFilename = outputFilename
+        self.step = step
+        self.inputsDigest = inputsDigest
+        self.path = outputFilename + BuildManifest.__suffix
+
+    def __load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as inputFile:
+                records = json.load(inputFile)['records']
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+        return records if isinstance(records, dict) else {}
+
+    def __getOutputHash(self):
+        if not os.path.isfile(self.outputFilename):
+            return None
+        return ParseCache.GetFileHash(self.outputFilename)
+
+    def isUpToDate(self, inputHash=None):
+        """Check whether step with these inputs would write the same output
+
+        inputHash is hash of input file of step which reads other output, it is
+        None for steps without such input or which change output in place.
+        """
+        records = self.__load()
+        record = records.get(self.step)
+        if not isinstance(record, dict) or record.get('inputs') != self.inputsDigest:
+            return False
+        if inputHash is not None and record.get('input') != inputHash:
+            return False
+        acceptedHashes = set([ record.get('output') ])
+        for step, stepRecord in records.items():
+            if step != self.step and isinstance(stepRecord, dict) and stepRecord.get('input') == record.get('output'):
+                acceptedHashes.add(stepRecord.get('output'))
+        outputHash = self.__getOutputHash()
+        return outputHash is not None and outputHash in acceptedHashes
+
+    def update(self, inputHash=None):
+        records = self.__load()
+        records[self.step] = { 'inputs': self.inputsDigest, 'input': inputHash, 'output': self.__getOutputHash() }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tempPath = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as outputFile:
+                    json.dump({ 'version': BuildManifest.__formatVersion, 'records': records }, outputFile, indent=2, sort_keys=True)
+                os.replace(tempPath, self.path)
+            except:
+                os.remove(tempPath)
+                raise
+        except OSError as err:
+            print(f'Note: build manifest is not updated: {err}')
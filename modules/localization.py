@@ -1,23 +1,67 @@
 #!/usr/bin/python
 
-# Please install deps before usage:
-#
-# python -m pip install pandas
-# python -m pip install xlrd
-# python -m pip install xlsxwriter
-
 import os
 import sys
-try:
-    import pandas
-except ImportError:
-    pass
-import pathlib
-import codecs
-import math
 import re
+import bisect
+import itertools
+import operator
 import collections
-import xml.etree.cElementTree as ET
+from modules.storage import CompactStorage
+from modules.report import Finding, Report
+from modules.profiler import Profiler
+
+# XLSX, XLIFF and process pool backends are imported on first use to keep
+# startup of INI only commands fast
+
+class PrefixMatcher:
+    """Longest prefix match of keys over a set of prefix rules
+
+    Rules are kept in one dict and probed once per distinct prefix length,
+    from longest to shortest, so match time doesn't depend on number of
+    rules. Each key gets value of its longest matching prefix.
+    """
+
+    __missing = object()
+
+    @staticmethod
+    def FromRulesFile(filename):
+        """Read rules file with '+prefix' (match) and '-prefix' (exclude) lines"""
+        matcher = PrefixMatcher()
+        with open(filename, "r") as f:
+            for rule in f.read().splitlines():
+                if rule.startswith('+'):
+                    matcher.addRule(rule[1:], True)
+                elif rule.startswith('-'):
+                    matcher.addRule(rule[1:], False)
+        return matcher
+
+    def __init__(self, rules=()):
+        self.__rules = {}
+        self.__lengths = []
+        if hasattr(rules, 'items'):
+            rules = rules.items()
+        for prefix, value in rules:
+            self.addRule(prefix, value)
+
+    def addRule(self, prefix, value):
+        self.__rules[prefix] = value
+        if len(prefix) not in self.__lengths:
+            self.__lengths.append(len(prefix))
+            self.__lengths.sort(reverse=True)
+
+    def getRulesCount(self):
+        return len(self.__rules)
+
+    def match(self, key, default=None):
+        rules = self.__rules
+        keyLength = len(key)
+        for length in self.__lengths:
+            if length <= keyLength:
+                value = rules.get(key[:length], PrefixMatcher.__missing)
+                if value is not PrefixMatcher.__missing:
+                    return value
+        return default
 
 class splitConfig:
     @staticmethod
@@ -41,12 +85,25 @@ class splitConfig:
             self.files.append(file)
             for prefix in [x.strip() for x in config[file].split(',')]:
                 self.prefixMap[prefix] = file
+        self.prefixMatcher = PrefixMatcher(self.prefixMap)
 
     def searchKeyFile(self, key):
-        for prefix in self.prefixMap:
-            if key.startswith(prefix):
-                return self.prefixMap[prefix]
-        return None
+        return self.prefixMatcher.match(key)
+
+class excludeConfig:
+    """Keys never taken from translation: built-in keys and exclude_translate_keys of [general] section"""
+
+    defaultKeys = frozenset(['mobiGlas_ui_notification_Party_Title'])
+
+    def __init__(self, config=None):
+        self.keys = set(excludeConfig.defaultKeys)
+        if config is not None and 'general' in config:
+            generalConfig = dict(config.items('general'))
+            if 'exclude_translate_keys' in generalConfig:
+                self.keys.update([x.strip() for x in filter(None, generalConfig['exclude_translate_keys'].split(',')) if len(x.strip()) > 0])
+
+    def isExcludedKey(self, key):
+        return key in self.keys
 
 class IniParseError(Exception):
     """Exception raised for errors in the input.
@@ -57,6 +114,7 @@ class IniParseError(Exception):
     """
 
     def __init__(self, message, lineNumber):
+        super().__init__(message, lineNumber)
         self.message = message
         self.lineNumber = lineNumber
 
@@ -72,6 +130,7 @@ class XlsxParseError(Exception):
     """
 
     def __init__(self, message, lineNumber):
+        super().__init__(message, lineNumber)
         self.message = message
         self.lineNumber = lineNumber
 
@@ -82,15 +141,32 @@ class LocalizationIni:
     __utf8_bom = u'\ufeff'
     __delimiter = '='
     __whitespaces = "\r\n\t\ufeff"
+    __newline = '\r\n'
+    __writeChunkSize = 8192
+    __readChunkSize = 1 << 20
     __namedFormatExpr = re.compile(r'\~([a-z]+)\(([^\)]*)\)')
     __unnamedFormatExpr = re.compile(r'<[^-=< ][^>]*>|%ls|%s|%S|%i|%I|%u|%d|%[0-9.]*f|%\.\*f')
     __englishWordsExpr = re.compile(r'[A-Za-z]+')
+    # one alternation of all token kinds, the kind is told by first character;
+    # lookahead of possible first characters lets scanner skip other text fast
+    __textTokenExpr = re.compile(r'(?=[A-Za-z<%~\\])(?:' + '|'.join([ __unnamedFormatExpr.pattern, r'\~[a-z]+\([^\)]*\)', r'\\n?', __englishWordsExpr.pattern ]) + ')')
+    # tokens containing other token starts are split differently by separate scans
+    __nestedTokenExpr = re.compile(r'[~%<\\]')
     __languageWordsExpr = re.compile(r'[\w-]+', re.UNICODE)
     __parseExceptions = False
     __interactiveMode = False
+    __compactStorage = False
+    __parseCache = None
+    __parseErrorsCount = 0
+    __loadJobs = 1
+    __formatMemo = collections.OrderedDict()
+    __formatMemoSize = 4096
+    __formatHits = 0
+    __formatMisses = 0
 
     @staticmethod
     def __RaiseException(exception):
+        LocalizationIni.__parseErrorsCount += 1
         if LocalizationIni.__parseExceptions:
             raise exception
         else:
@@ -98,6 +174,35 @@ class LocalizationIni:
             if LocalizationIni.__interactiveMode:
                 input()
 
+    @staticmethod
+    def __NewData(items=()):
+        if LocalizationIni.__compactStorage:
+            return CompactStorage(items)
+        return collections.OrderedDict(items)
+
+    @staticmethod
+    def __CachedLoad(filename, loaderName, params, loader):
+        with Profiler.Stage('load-' + loaderName) as stage:
+            data = LocalizationIni.__CachedLoadData(filename, loaderName, params, loader)
+            # multi column loaders return list of data, first one has all keys
+            stage.setItems(len(data[0] if isinstance(data, list) else data))
+        return data
+
+    @staticmethod
+    def __CachedLoadData(filename, loaderName, params, loader):
+        cache = LocalizationIni.__parseCache
+        if cache is None:
+            return loader()
+        cacheKey = cache.getKey(filename, loaderName, params + (LocalizationIni.__compactStorage,))
+        data = cache.get(cacheKey)
+        if data is None:
+            errorsCount = LocalizationIni.__parseErrorsCount
+            data = loader()
+            # files with reported errors are parsed again to report errors again
+            if errorsCount == LocalizationIni.__parseErrorsCount:
+                cache.put(cacheKey, data)
+        return data
+
     @staticmethod
     def __ParseKeyValue(line):
         if line:
@@ -107,47 +212,127 @@ class LocalizationIni:
         return None
 
     @staticmethod
-    def __ParseXlsxCellValue(line):
+    def __ParseIniLines(lines):
+        whitespaces = LocalizationIni.__whitespaces
+        delimiter = LocalizationIni.__delimiter
+        Profiler.Count('ini.parsed-lines', len(lines))
+        pairs = [line.split(delimiter, 1) for line in [line.strip(whitespaces) for line in lines] if line]
         try:
-            if math.isnan(line):
-                return None
-            else:
-                return LocalizationIni.__ParseKeyValue(line)
-        except Exception as e:
-            return LocalizationIni.__ParseKeyValue(line)
+            return LocalizationIni.__NewData(pairs)
+        except ValueError:
+            pass
+        # slow path only to report invalid lines with their numbers
+        data = LocalizationIni.__NewData()
+        lineNumber = 1
+        for line in lines:
+            parts = LocalizationIni.__ParseKeyValue(line)
+            if parts:
+                if len(parts) != 2:
+                    LocalizationIni.__RaiseException(IniParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
+                else:
+                    data[parts[0]] = parts[1]
+            lineNumber += 1
+        return data
 
     @staticmethod
     def __LoadFromIniFile(filename):
-        data = collections.OrderedDict()
-        with codecs.open(filename, "r", "utf-8") as inputFile:
-            lineNumber = 1
-            for line in inputFile:
-                parts = LocalizationIni.__ParseKeyValue(line)
-                if parts:
-                    if len(parts) != 2:
-                        LocalizationIni.__RaiseException(IniParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
-                    else:
-                        data[parts[0]] = parts[1]
-                lineNumber += 1
-        return data
+        if LocalizationIni.__compactStorage:
+            # pairs are packed chunk by chunk, whole text and its lines are never held at once
+            return CompactStorage(LocalizationIni.__IterIniFilePairs(filename, True))
+        with open(filename, "rb") as inputFile:
+            text = inputFile.read().decode("utf-8")
+        # same line boundaries as codecs reader, line endings are stripped by parser
+        return LocalizationIni.__ParseIniLines(text.splitlines(True))
+
+    @staticmethod
+    def __IterIniFileLines(filename):
+        """Lists of lines of INI file read in chunks, line boundaries are same as of whole text"""
+        import codecs
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        tail = ''
+        with open(filename, "rb") as inputFile:
+            while True:
+                chunk = inputFile.read(LocalizationIni.__readChunkSize)
+                lines = (tail + decoder.decode(chunk, not chunk)).splitlines(True)
+                # last line may continue in next chunk, also '\r' may be followed by '\n'
+                tail = lines.pop() if chunk and lines else ''
+                if lines:
+                    yield lines
+                if not chunk:
+                    break
+
+    @staticmethod
+    def __IterIniFilePairs(filename, reportErrors):
+        whitespaces = LocalizationIni.__whitespaces
+        delimiter = LocalizationIni.__delimiter
+        lineNumber = 1
+        for lines in LocalizationIni.__IterIniFileLines(filename):
+            Profiler.Count('ini.parsed-lines', len(lines))
+            pairs = [line.split(delimiter, 1) for line in [line.strip(whitespaces) for line in lines] if line]
+            if min(map(len, pairs), default=2) == 2:
+                yield from pairs
+                lineNumber += len(lines)
+            else:
+                for line in lines:
+                    parts = LocalizationIni.__ParseKeyValue(line)
+                    if parts:
+                        if len(parts) == 2:
+                            yield parts
+                        elif reportErrors:
+                            LocalizationIni.__RaiseException(IniParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
+                    lineNumber += 1
+
+    @staticmethod
+    def IterIniFile(filename):
+        """Iterate (key, value) pairs of INI file without loading whole file
+
+        Pairs come in same order and with same values as from FromIniFile, repeated
+        key is returned once at its first position with its last value. File is read
+        twice, first pass only collects values of repeated keys.
+        """
+        keyHashes = set()
+        lastValues = {}
+        for key, value in LocalizationIni.__IterIniFilePairs(filename, False):
+            keyHash = hash(key)
+            if keyHash in keyHashes:
+                # colliding different key only gets its own value here
+                lastValues[key] = value
+            else:
+                keyHashes.add(keyHash)
+        del keyHashes
+        repeatedKeys = set()
+        for key, value in LocalizationIni.__IterIniFilePairs(filename, True):
+            if key in lastValues:
+                if key in repeatedKeys:
+                    continue
+                repeatedKeys.add(key)
+                value = lastValues[key]
+            yield key, value
+
+    @staticmethod
+    def __IterXlsxRows(filename, sheetName, columnsCount):
+        # first sheet row is header, so line numbers are sheet row numbers minus one
+        from modules.xlsx import XlsxReader
+        rowsCount = 0
+        with XlsxReader(filename) as reader:
+            for rowNumber, row in reader.iterRows(sheetName):
+                rowsCount += 1
+                if rowNumber > 1:
+                    if len(row) < columnsCount:
+                        row.extend([None] * (columnsCount - len(row)))
+                    yield rowNumber - 1, row
+        Profiler.Count('xlsx.parsed-rows', rowsCount)
 
     @staticmethod
     def __LoadFromXlsxFileColumn(filename, sheetName, columnIndex):
-        data = collections.OrderedDict()
-        with pandas.ExcelFile(filename) as inputFile:
-            sheet = inputFile.parse(sheet_name=sheetName)
-            lineNumber = 1
-            for row in sheet.values:
-                if columnIndex >= len(row):
-                   LocalizationIni.__RaiseException(XlsxParseError("Invalid column index {0} for row".format(columnIndex), lineNumber))
+        data = LocalizationIni.__NewData()
+        for lineNumber, row in LocalizationIni.__IterXlsxRows(filename, sheetName, columnIndex + 1):
+            parts = LocalizationIni.__ParseKeyValue(row[columnIndex])
+            if parts:
+                if len(parts) != 2:
+                    LocalizationIni.__RaiseException(XlsxParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
                 else:
-                    parts = LocalizationIni.__ParseXlsxCellValue(row[columnIndex]);
-                    if parts:
-                        if len(parts) != 2:
-                            LocalizationIni.__RaiseException(XlsxParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
-                        else:
-                            data[parts[0]] = parts[1]
-                lineNumber += 1
+                    data[parts[0]] = parts[1]
         return data
 
     @staticmethod
@@ -155,54 +340,85 @@ class LocalizationIni:
         data = []
         columnIndex = 0
         while columnIndex < columnsCount:
-            data.append(collections.OrderedDict())
+            data.append(LocalizationIni.__NewData())
             columnIndex += 1
-        with pandas.ExcelFile(filename) as inputFile:
-            sheet = inputFile.parse(sheet_name=sheetName)
-            lineNumber = 1
-            for row in sheet.values:
-                if len(row) == 0:
-                    LocalizationIni.__RaiseException(XlsxParseError("Less than {0} columns found".format(columnsCount), lineNumber))
-                    lineNumber += 1
-                    continue
-                parts = LocalizationIni.__ParseXlsxCellValue(row[0]);
-                if parts:
-                    if len(parts) != 2:
-                        LocalizationIni.__RaiseException(XlsxParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
-                    else:
-                        data[0][parts[0]] = parts[1]
-                        columnIndex = 1
-                        while (columnIndex < columnsCount) and (columnIndex < len(row)):
-                            subParts = LocalizationIni.__ParseXlsxCellValue(row[columnIndex]);
-                            if subParts:
-                                if len(subParts) != 2:
-                                    LocalizationIni.__RaiseException(XlsxParseError("Missing translation key value separator '=': {0}".format(parts[0]), lineNumber))
+        for lineNumber, row in LocalizationIni.__IterXlsxRows(filename, sheetName, columnsCount):
+            parts = LocalizationIni.__ParseKeyValue(row[0])
+            if parts:
+                if len(parts) != 2:
+                    LocalizationIni.__RaiseException(XlsxParseError("Missing key value separator '=': {0}".format(parts[0]), lineNumber))
+                else:
+                    data[0][parts[0]] = parts[1]
+                    columnIndex = 1
+                    while columnIndex < columnsCount:
+                        subParts = LocalizationIni.__ParseKeyValue(row[columnIndex])
+                        if subParts:
+                            if len(subParts) != 2:
+                                LocalizationIni.__RaiseException(XlsxParseError("Missing translation key value separator '=': {0}".format(parts[0]), lineNumber))
+                            else:
+                                if subParts[0] != parts[0]:
+                                    LocalizationIni.__RaiseException(XlsxParseError("Translation key change found: {0} -> {1}".format(parts[0], subParts[0]), lineNumber))
                                 else:
-                                    if subParts[0] != parts[0]:
-                                        LocalizationIni.__RaiseException(XlsxParseError("Translation key change found: {0} -> {1}".format(parts[0], subParts[0]), lineNumber))
-                                    else:
-                                        data[columnIndex][subParts[0]] = subParts[1]
-                            columnIndex += 1
-                lineNumber += 1
+                                    data[columnIndex][subParts[0]] = subParts[1]
+                        columnIndex += 1
         return data
 
+    @staticmethod
+    def __LoadFromXlsxFileColumnsCached(filename, sheetName, columnsCount):
+        return LocalizationIni.__CachedLoad(filename, 'xlsx-columns', (sheetName, columnsCount),
+                                            lambda: LocalizationIni.__LoadFromXlsxFileColumns(filename, sheetName, columnsCount))
+
+    @staticmethod
+    def __LoadFromXliffFile(filename):
+        import xml.etree.cElementTree as ET
+        source_data = LocalizationIni.__NewData()
+        target_data = LocalizationIni.__NewData()
+        parents = []
+        unitsCount = 0
+        for event, element in ET.iterparse(filename, events=('start', 'end')):
+            if event == 'start':
+                if not parents:
+                    ns = element.tag[:element.tag.find('}') + 1]
+                    trans_unit_tag = ns + 'trans-unit'
+                    source_tag = ns + 'source'
+                    target_tag = ns + 'target'
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag != trans_unit_tag:
+                continue
+            key = element.get('resname')
+            translate = element.get('translate')
+            source_value = element.find(source_tag)
+            target_value = element.find(target_tag)
+            unitsCount += 1
+            source_data[key] = '' if source_value.text is None else source_value.text
+            if target_value is not None and (translate == 'no' or target_value.get('state') == 'final'):
+                target_data[key] = '' if target_value.text is None else target_value.text
+            # processed unit is dropped from tree to keep memory bounded
+            if parents:
+                parents[-1].remove(element)
+        Profiler.Count('xliff.parsed-units', unitsCount)
+        return [ source_data, target_data ]
+
     @staticmethod
     def Empty():
-        return LocalizationIni(collections.OrderedDict())
+        return LocalizationIni(LocalizationIni.__NewData())
 
     @staticmethod
     def FromIniFile(filename):
-        return LocalizationIni(LocalizationIni.__LoadFromIniFile(filename))
+        return LocalizationIni(LocalizationIni.__CachedLoad(filename, 'ini', (), lambda: LocalizationIni.__LoadFromIniFile(filename)))
 
     @staticmethod
     def FromXlsxFile(filename, sheetName):
-        return LocalizationIni(LocalizationIni.__LoadFromXlsxFileColumn(filename, sheetName, 0))
+        return LocalizationIni(LocalizationIni.__CachedLoad(filename, 'xlsx-column', (sheetName, 0),
+                                                            lambda: LocalizationIni.__LoadFromXlsxFileColumn(filename, sheetName, 0)))
 
     @staticmethod
     def FromXlsxFileColumns(filename, sheetName, columnsCount):
         result = []
         if columnsCount > 0:
-            dataArray = LocalizationIni.__LoadFromXlsxFileColumns(filename, sheetName, columnsCount)
+            dataArray = LocalizationIni.__LoadFromXlsxFileColumnsCached(filename, sheetName, columnsCount)
             for data in dataArray:
                 result.append(LocalizationIni(data))
         return result
@@ -211,35 +427,59 @@ class LocalizationIni:
     def FromXlsxFiles(filename, sheetName, columnsCount, filenames):
         result = []
         if columnsCount > 0:
-            print(f'Loading {filename}')
-            outPath = pathlib.Path(filename).parent.absolute()
-            dataArray = LocalizationIni.__LoadFromXlsxFileColumns(filename, sheetName, columnsCount)          
-            for filename in filenames:
-                print(f'Loading {filename}.xlsx')
-                additionalDataArray = LocalizationIni.__LoadFromXlsxFileColumns(os.path.join(outPath, filename + ".xlsx"), filename, columnsCount)
+            outPath = os.path.dirname(os.path.abspath(filename))
+            documents = [ (filename, sheetName, filename) ]
+            for splitFilename in filenames:
+                documents.append((os.path.join(outPath, splitFilename + ".xlsx"), splitFilename, splitFilename + '.xlsx'))
+            jobs = min(LocalizationIni.__loadJobs, len(documents))
+            if jobs > 1:
+                # split documents are independent, merge results in configured order
+                import concurrent.futures
+                with concurrent.futures.ProcessPoolExecutor(max_workers=jobs, initializer=LocalizationIni.ApplySettings,
+                                                            initargs=(LocalizationIni.GetSettings(),)) as executor:
+                    futures = [ executor.submit(LocalizationIni.LoadXlsxFileColumnsDataCounted, documentFilename, documentSheetName, columnsCount)
+                                for documentFilename, documentSheetName, documentName in documents ]
+                    dataArrays = []
+                    for (documentFilename, documentSheetName, documentName), future in zip(documents, futures):
+                        data, cacheHits, cacheMisses = future.result()
+                        print(f'Loaded {documentName}')
+                        # workers count cache use on their own copy of cache
+                        if LocalizationIni.__parseCache:
+                            LocalizationIni.__parseCache.hits += cacheHits
+                            LocalizationIni.__parseCache.misses += cacheMisses
+                        dataArrays.append(data)
+            else:
+                dataArrays = []
+                for documentFilename, documentSheetName, documentName in documents:
+                    print(f'Loading {documentName}')
+                    dataArrays.append(LocalizationIni.LoadXlsxFileColumnsData(documentFilename, documentSheetName, columnsCount))
+            dataArray = dataArrays[0]
+            for additionalDataArray in dataArrays[1:]:
                 for i in range(0, columnsCount):
                     dataArray[i].update(additionalDataArray[i])
             for data in dataArray:
                 result.append(LocalizationIni(data))
         return result
 
+    @staticmethod
+    def LoadXlsxFileColumnsData(filename, sheetName, columnsCount):
+        """Load raw column data of XLSX document"""
+        return LocalizationIni.__LoadFromXlsxFileColumnsCached(filename, sheetName, columnsCount)
+
+    @staticmethod
+    def LoadXlsxFileColumnsDataCounted(filename, sheetName, columnsCount):
+        """Worker entry point, returns raw column data with parse cache hits and misses of this load"""
+        cache = LocalizationIni.__parseCache
+        if cache is None:
+            return LocalizationIni.LoadXlsxFileColumnsData(filename, sheetName, columnsCount), 0, 0
+        hits, misses = cache.hits, cache.misses
+        data = LocalizationIni.LoadXlsxFileColumnsData(filename, sheetName, columnsCount)
+        return data, cache.hits - hits, cache.misses - misses
+
     @staticmethod
     def FromXliffFile(filename):
-        source_ini = LocalizationIni.Empty()
-        target_ini = LocalizationIni.Empty()
-        tree = ET.ElementTree(file=filename)
-        root = tree.getroot()
-        ns = {'xliff': root.tag.split('}', 1)[0][1:]}
-        trans_units = root.findall('.//xliff:trans-unit', namespaces=ns)
-        for trans_unit in trans_units:
-            key = trans_unit.get('resname')
-            translate = trans_unit.get('translate')
-            source_value = trans_unit.find('xliff:source', namespaces=ns)
-            target_value =  trans_unit.find('xliff:target', namespaces=ns)
-            source_ini.putKeyValue(key, '' if source_value.text is None else source_value.text)
-            if translate == 'no' or target_value.get('state') == 'final':
-                target_ini.putKeyValue(key, '' if target_value.text is None else target_value.text)
-        return [ source_ini, target_ini ]
+        dataArray = LocalizationIni.__CachedLoad(filename, 'xliff', (), lambda: LocalizationIni.__LoadFromXliffFile(filename))
+        return [ LocalizationIni(data) for data in dataArray ]
 
     @staticmethod
     def FromMultilang(filename, splitDocuments):
@@ -251,6 +491,7 @@ class LocalizationIni:
 
     def __init__(self, data):
         self.data = data
+        self.__formatIndex = {}
 
     def getItems(self):
         return self.data.items()
@@ -266,6 +507,7 @@ class LocalizationIni:
 
     def putKeyValue(self, key, value):
         self.data[key] = value
+        self.__formatIndex.pop(key, None)
 
     def getKeysSet(self):
         return set(self.data)
@@ -273,23 +515,73 @@ class LocalizationIni:
     def addLocalizationIni(self, localizationIni):
         for key, value in localizationIni.data.items():
             self.data[key] = value
+        self.__formatIndex.clear()
+
+    def getFormatSignature(self, key):
+        """Format signature of key value, computed once per key and kept while value is not changed"""
+        signature = self.__formatIndex.get(key)
+        if signature is not None:
+            LocalizationIni.__formatHits += 1
+            return signature
+        value = self.data.get(key)
+        if value is None:
+            return None
+        LocalizationIni.__formatMisses += 1
+        signature = FormatSignature.FromValue(value)
+        self.__formatIndex[key] = signature
+        return signature
 
     def saveToIniFile(self, filename):
-        with codecs.open(filename, "w", "utf-8") as outputFile:
-            outputFile.write(LocalizationIni.__utf8_bom)
-            for key, value in self.data.items():
-                outputFile.write(key)
-                outputFile.write(LocalizationIni.__delimiter)
-                outputFile.write(value)
-                outputFile.write('\r\n')
+        LocalizationIni.SaveItemsToIniFile(filename, self.data.items())
+
+    @staticmethod
+    def __GetNewFileMode(filename):
+        try:
+            return os.stat(filename).st_mode & 0o7777
+        except OSError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    @staticmethod
+    def SaveItemsToIniFile(filename, items):
+        """Write (key, value) pairs from any iterable to INI file
+
+        Lines are joined and encoded in chunks and written to temporary file
+        which replaces output file only after all items are written.
+        """
+        filename = os.path.abspath(filename)
+        fileMode = LocalizationIni.__GetNewFileMode(filename)
+        newline = LocalizationIni.__newline
+        joinKeyValue = LocalizationIni.__delimiter.join
+        items = iter(items)
+        itemsCount = 0
+        import tempfile
+        with Profiler.Stage('save-ini') as stage:
+            fd, tempFilename = tempfile.mkstemp(dir=os.path.dirname(filename), prefix=os.path.basename(filename) + '.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as outputFile:
+                    outputFile.write(LocalizationIni.__utf8_bom.encode('utf-8'))
+                    while True:
+                        chunk = list(itertools.islice(items, LocalizationIni.__writeChunkSize))
+                        if not chunk:
+                            break
+                        itemsCount += len(chunk)
+                        outputFile.write((newline.join(map(joinKeyValue, chunk)) + newline).encode('utf-8'))
+                os.chmod(tempFilename, fileMode)
+                os.replace(tempFilename, filename)
+            except:
+                os.remove(tempFilename)
+                raise
+            stage.setItems(itemsCount)
 
     def saveToXlsxFile(self, filename, sheetName):
-        outputData = [ 'en' ]
-        for key, value in self.data.items():
-            line = key + LocalizationIni.__delimiter + value
-            outputData.append(line)
-        dataFrame = pandas.DataFrame(outputData, columns=[ 'A' ])
-        dataFrame.to_excel(filename, sheet_name=sheetName, index=False, header=False)
+        from modules.xlsx import XlsxWriter
+        with Profiler.Stage('save-xlsx') as stage, XlsxWriter(filename, sheetName) as outputXlsx:
+            outputXlsx.append([ 'en' ])
+            for key, value in self.data.items():
+                outputXlsx.append([ key + LocalizationIni.__delimiter + value ])
+            stage.setItems(len(self.data))
 
     @staticmethod
     def GetKeyValueText(key, value):
@@ -314,6 +606,76 @@ class LocalizationIni:
     def GetUnnamedFormats(value):
         return LocalizationIni.__unnamedFormatExpr.findall(value)
 
+    @staticmethod
+    def GetTextTokens(value):
+        """Formats, English words and escapes of value found in one tokenizer pass
+
+        Gives same formats and words as GetUnnamedFormats, GetNamedFormats and
+        GetEnglishWords over GetCleanText. Values with nested tokens or escaped
+        backslashes, where separate scans and replaces may disagree with single
+        pass, are processed by the separate scans.
+        """
+        if '\\\\' not in value:
+            unnamedFormats = []
+            namedFormats = set()
+            englishWords = set()
+            hasEscapedNewline = False
+            hasOtherEscape = False
+            for token in LocalizationIni.__textTokenExpr.findall(value):
+                first = token[0]
+                if first >= 'A' and first != '\\' and first != '~':
+                    englishWords.add(token)
+                elif first == '~':
+                    separator = token.index('(')
+                    if LocalizationIni.__nestedTokenExpr.search(token, separator):
+                        break
+                    namedFormats.add((token[1:separator], token[separator + 1:-1]))
+                elif first == '\\':
+                    if len(token) == 2:
+                        hasEscapedNewline = True
+                    else:
+                        hasOtherEscape = True
+                else:
+                    if first == '<' and LocalizationIni.__nestedTokenExpr.search(token, 1):
+                        break
+                    unnamedFormats.append(token)
+            else:
+                return TextTokens(FormatSignature.FromFormats(unnamedFormats, namedFormats), englishWords, hasEscapedNewline, hasOtherEscape)
+        unnamedFormats = LocalizationIni.GetUnnamedFormats(value)
+        namedFormats = LocalizationIni.GetNamedFormats(value)
+        englishWords = LocalizationIni.GetEnglishWords(LocalizationIni.GetCleanText(value, unnamedFormats, namedFormats))
+        hasEscape = '\\' in value
+        return TextTokens(FormatSignature.FromFormats(unnamedFormats, namedFormats), englishWords, hasEscape, hasEscape)
+
+    @staticmethod
+    def GetFormatSignature(value):
+        """Format signature of value not stored in loaded ini, recently used signatures are memoized"""
+        memo = LocalizationIni.__formatMemo
+        signature = memo.get(value)
+        if signature is not None:
+            LocalizationIni.__formatHits += 1
+            memo.move_to_end(value)
+            return signature
+        LocalizationIni.__formatMisses += 1
+        signature = FormatSignature.FromValue(value)
+        memo[value] = signature
+        if len(memo) > LocalizationIni.__formatMemoSize:
+            memo.popitem(last=False)
+        return signature
+
+    @staticmethod
+    def GetFormatStats():
+        return (LocalizationIni.__formatHits, LocalizationIni.__formatMisses)
+
+    @staticmethod
+    def GetCounters():
+        """Counters of caches reported by profiler"""
+        counters = { 'format-signature.hits': LocalizationIni.__formatHits, 'format-signature.misses': LocalizationIni.__formatMisses }
+        if LocalizationIni.__parseCache:
+            counters['parse-cache.hits'] = LocalizationIni.__parseCache.hits
+            counters['parse-cache.misses'] = LocalizationIni.__parseCache.misses
+        return counters
+
     @staticmethod
     def GetTextWithoutFormats(value, removeFormats):
         result = value
@@ -347,12 +709,113 @@ class LocalizationIni:
     def SetInteractiveMode(enabled):
         LocalizationIni.__interactiveMode = enabled;
 
+    @staticmethod
+    def SetCompactStorage(enabled):
+        LocalizationIni.__compactStorage = enabled
+
+    @staticmethod
+    def SetParseCache(cache):
+        LocalizationIni.__parseCache = cache
+
+    @staticmethod
+    def GetParseCache():
+        return LocalizationIni.__parseCache
+
+    @staticmethod
+    def SetLoadJobs(jobs):
+        LocalizationIni.__loadJobs = max(1, jobs)
+
+    @staticmethod
+    def GetSettings():
+        return (LocalizationIni.__parseExceptions, LocalizationIni.__compactStorage, LocalizationIni.__parseCache)
+
+    @staticmethod
+    def ApplySettings(settings):
+        """Apply settings from GetSettings in worker process, interactive mode is not available there"""
+        LocalizationIni.__parseExceptions, LocalizationIni.__compactStorage, LocalizationIni.__parseCache = settings
+        LocalizationIni.__interactiveMode = False
+
+class FormatSignature:
+    """Unnamed and named formats of one value
+
+    Named format aliases (`~name(Main|Alias)` may be translated as
+    `~name(Main)`) are resolved once, on first comparison that needs them,
+    so later comparisons don't split formats again. Values without any
+    formats share one instance.
+    """
+
+    __slots__ = ('unnamed', 'named', 'aliases')
+
+    @staticmethod
+    def FromValue(value):
+        return FormatSignature.FromFormats(LocalizationIni.GetUnnamedFormats(value), LocalizationIni.GetNamedFormats(value))
+
+    @staticmethod
+    def FromFormats(unnamed, named):
+        if not unnamed and not named:
+            return FormatSignature.Empty
+        return FormatSignature(unnamed, named)
+
+    def __init__(self, unnamed, named):
+        self.unnamed = unnamed
+        self.named = named
+        self.aliases = None
+
+    def __getstate__(self):
+        return (self.unnamed, self.named, self.aliases)
+
+    def __setstate__(self, state):
+        self.unnamed, self.named, self.aliases = state
+
+    def isNamedFormatEquals(self, other):
+        """Same result as LocalizationIni.IsNamedFormatEquals(self.named, other.named)"""
+        if self.named == other.named:
+            return True
+        if self.aliases is None:
+            self.aliases = {}
+            for format in self.named:
+                parts = format[1].split('|')
+                self.aliases[format] = (format[0], parts[0]) if len(parts) == 2 else None
+        for missingFormat in self.named - other.named:
+            alias = self.aliases[missingFormat]
+            if alias is None or alias not in other.named:
+                return False
+        return True
+
+    def isFormatEquals(self, other):
+        return (self.unnamed == other.unnamed) and self.isNamedFormatEquals(other)
+
+FormatSignature.Empty = FormatSignature([], set())
+
+class TextTokens:
+    """Result of LocalizationIni.GetTextTokens
+
+    Escape flags tell which newline checks may find anything: escaped
+    newline for space before newline, other escape for lost newline.
+    """
+
+    __slots__ = ('formats', 'englishWords', 'hasEscapedNewline', 'hasOtherEscape')
+
+    def __init__(self, formats, englishWords, hasEscapedNewline, hasOtherEscape):
+        self.formats = formats
+        self.englishWords = englishWords
+        self.hasEscapedNewline = hasEscapedNewline
+        self.hasOtherEscape = hasOtherEscape
+
 class MultiLangXlsx:
 
     @staticmethod
     def Empty(language):
         return MultiLangXlsx([[ 'en', language ]])
 
+    @staticmethod
+    def Create(filename, sheetName, language):
+        """Document which writes appended rows straight to XLSX file until close"""
+        from modules.xlsx import XlsxWriter
+        outputXlsx = XlsxWriter(filename, sheetName)
+        outputXlsx.append([ 'en', language ])
+        return MultiLangXlsx(outputXlsx)
+
     def __init__(self, data):
         self.data = data
         self.autoMarkEmptyAsTranslated = False
@@ -373,15 +836,38 @@ class MultiLangXlsx:
             self.data.append([line, ''])
 
     def saveToXlsxFile(self, filename, sheetName):
-        dataFrame = pandas.DataFrame(self.data, columns=[ 'A', 'B' ])
-        dataFrame.to_excel(filename, sheet_name=sheetName, index=False, header=False)
+        from modules.xlsx import XlsxWriter
+        with XlsxWriter(filename, sheetName) as outputXlsx:
+            for row in self.data:
+                outputXlsx.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        # streamed document is deleted when written with exception in flight
+        if hasattr(self.data, '__exit__'):
+            self.data.__exit__(type, value, traceback)
+
+    def close(self):
+        if hasattr(self.data, 'close'):
+            self.data.close()
 
 class LocalizationVerifier:
     __lostNewlineExpr = re.compile(r'[^\\]\\[^n\\]')
-    __spaceBeforeNewlineExpr = re.compile(r' \\n')
+    __sourceRowsExpr = re.compile(r'[<%~]')
+    __codepointsExpr = re.compile(r'(?:\\u[0-9A-Fa-f]{4})*')
+    __codepointExpr = re.compile(r'\\u([0-9A-Fa-f]{4})')
     __truths = set(['True', 'true', 1, '1'])
+    __skipUnnamedFormatKeys = PrefixMatcher([ ('PU_', True), ('PH_PU_', True), ('DXSM_', True) ])
     __verifyExceptions = False
     __interactiveMode = False
+    __shardsPerJob = 4
+    __minShardedItems = 1000
+    __verdictCache = None
+    __report = None
+    # bump when findings of the same input change
+    __verdictsVersion = 2
 
     @staticmethod
     def __RaiseVerifyError(text):
@@ -392,86 +878,213 @@ class LocalizationVerifier:
             if LocalizationVerifier.__interactiveMode:
                 input()
 
-    @staticmethod
-    def __NamedFormatToString(formatSet):
-        result = ''
-        for format in formatSet:
-            if result:
-                result += ', '
-            result += f'~{format[0]}({format[1]})'
-        return result
-
     @staticmethod
     def __ReadCodepointCharactersSet(inputFilename):
         characterSet = set({ ' ', '\t' }); #, '\xa0'
-        with codecs.open(inputFilename, "r", "utf-8") as inputFile:
-            while True:
-                prefix = inputFile.read(2)
-                if not prefix:
-                    break;
-                if prefix != '\\u':
-                    LocalizationVerifier.__RaiseVerifyError(f'Found invalid codepoint prefix: {prefix}')
-                    return set()
-                codepoint = inputFile.read(4)
-                if not codepoint:
-                    LocalizationVerifier.__RaiseVerifyError('Missing codepoint')
-                    return set()
-                characterSet.add(chr(int(codepoint, 16)))
+        with open(inputFilename, 'r', encoding='utf-8', newline='') as inputFile:
+            text = inputFile.read()
+        if LocalizationVerifier.__codepointsExpr.fullmatch(text):
+            characterSet.update(chr(int(codepoint, 16)) for codepoint in LocalizationVerifier.__codepointExpr.findall(text))
+            return characterSet
+        # slow path only to report invalid content same way as sequential reading
+        position = 0
+        while position < len(text):
+            prefix = text[position:position + 2]
+            if prefix != '\\u':
+                LocalizationVerifier.__RaiseVerifyError(f'Found invalid codepoint prefix: {prefix}')
+                return set()
+            codepoint = text[position + 2:position + 6]
+            if not codepoint:
+                LocalizationVerifier.__RaiseVerifyError('Missing codepoint')
+                return set()
+            characterSet.add(chr(int(codepoint, 16)))
+            position += 6
         return characterSet
 
     def __init__(self, options):
         self.lostNewline = ('lost_newline' in options) and options['lost_newline'] in LocalizationVerifier.__truths
         self.spaceBeforeNewline = ('space_before_newline' in options) and options['space_before_newline'] in LocalizationVerifier.__truths
         self.englishWordsMismatch = ('english_words_mismatch' in options) and options['english_words_mismatch'] in LocalizationVerifier.__truths
+        self.columnsBackend = options.get('backend', 'loop') == 'columns'
         self.allowedCharacters = set()
         if 'allowed_characters_file' in options:
             allowedCharactersFile = options['allowed_characters_file']
             if os.path.isfile(allowedCharactersFile):
                 print(f"Read allowed characters: {allowedCharactersFile}")
                 self.allowedCharacters = LocalizationVerifier.__ReadCodepointCharactersSet(allowedCharactersFile)
+        if len(self.allowedCharacters) > 0:
+            # character class scan finds translations to check without per character objects
+            self.__notAllowedCharacterExpr = re.compile('[^' + ''.join(re.escape(character) for character in sorted(self.allowedCharacters)) + ']')
+        if Profiler.IsEnabled():
+            Profiler.InstrumentPatterns(self)
+
+    def verifyValue(self, key, value, translateValue, valueFormats=None):
+        """Check one translation and return list of its findings"""
+        findings = []
+        if (len(translateValue) == 0) and (len(value) > 0):
+            findings.append(Finding('error', 'empty-translation', key, {}))
+            return findings
+        if (len(self.allowedCharacters) > 0) and self.__notAllowedCharacterExpr.search(translateValue):
+            invalidCharacters = set(translateValue) - self.allowedCharacters
+            invalidCharacters.difference_update(value)
+            if len(invalidCharacters) > 0:
+                findings.append(Finding('error', 'invalid-characters', key, { 'characters': sorted(invalidCharacters) }))
+        if valueFormats is None:
+            valueFormats = FormatSignature.FromValue(value)
+        translateTokens = LocalizationIni.GetTextTokens(translateValue)
+        translateFormats = translateTokens.formats
+        if not LocalizationVerifier.__skipUnnamedFormatKeys.match(key, False):
+            if valueFormats.unnamed != translateFormats.unnamed:
+                findings.append(Finding('error', 'unnamed-format', key, { 'original': valueFormats.unnamed, 'translate': translateFormats.unnamed }))
+        if not valueFormats.isNamedFormatEquals(translateFormats):
+            findings.append(Finding('error', 'named-format', key, { 'original': sorted(valueFormats.named), 'translate': sorted(translateFormats.named) }))
+        if self.lostNewline and translateTokens.hasOtherEscape:
+            count = len(LocalizationVerifier.__lostNewlineExpr.findall(translateValue))
+            if count > 0:
+                findings.append(Finding('note', 'lost-newline', key, { 'count': count }))
+        if self.spaceBeforeNewline and translateTokens.hasEscapedNewline:
+            count = translateValue.count(' \\n')
+            if count > 0:
+                findings.append(Finding('note', 'space-before-newline', key, { 'count': count }))
+        if self.englishWordsMismatch:
+            translateEngWords = translateTokens.englishWords
+            if len(translateEngWords) > 0:
+                origEngWords = LocalizationIni.GetTextTokens(value).englishWords
+                if not translateEngWords.issubset(origEngWords):
+                    findings.append(Finding('note', 'english-words', key, { 'original': sorted(origEngWords), 'translate': sorted(translateEngWords),
+                                                                           'diff': sorted(translateEngWords.difference(origEngWords)) }))
+        return findings
+
+    def verifyItems(self, items):
+        """Check (key, value, translateValue) triples, returns list of findings for each item"""
+        return [ self.verifyValue(key, value, translateValue) for key, value, translateValue in items ]
+
+    def getOptionsDigest(self):
+        """Digest of everything besides the item itself that affects findings"""
+        import hashlib
+        optionsHash = hashlib.sha256()
+        optionsHash.update(f'{LocalizationVerifier.__verdictsVersion}|{self.lostNewline}|{self.spaceBeforeNewline}|{self.englishWordsMismatch}|'.encode('utf-8'))
+        optionsHash.update(''.join(sorted(self.allowedCharacters)).encode('utf-8', 'surrogatepass'))
+        return optionsHash.hexdigest()
+
+    def __getRowsExpr(self):
+        # characters which may lead to finding in translation row, others can't
+        specialCharacters = set('<%~')
+        if self.lostNewline or self.spaceBeforeNewline:
+            specialCharacters.add('\\')
+        if self.englishWordsMismatch:
+            specialCharacters.update(chr(code) for code in itertools.chain(range(ord('A'), ord('Z') + 1), range(ord('a'), ord('z') + 1)))
+        if len(self.allowedCharacters) > 0:
+            characterClass = '[^' + ''.join(re.escape(character) for character in sorted(self.allowedCharacters - specialCharacters)) + '\n]'
+        else:
+            characterClass = '[' + ''.join(re.escape(character) for character in sorted(specialCharacters)) + ']'
+        return re.compile(characterClass)
 
-    def verify(self, originalIni, translationIni):
-        for key, value in originalIni.getItems():
-            translateValue = translationIni.getKeyValue(key)
-            if translateValue != None:
-                if (len(translateValue) == 0) and (len(value) > 0):
-                    LocalizationVerifier.__RaiseVerifyError(f'empty translation - {key}')
-                    continue
-                if len(self.allowedCharacters) > 0:
-                    invalidCharacters = set()
-                    for translateChar in translateValue:
-                        if (translateChar not in self.allowedCharacters) and (translateChar not in value):
-                           invalidCharacters.add(translateChar)
-                    if len(invalidCharacters) > 0:
-                        LocalizationVerifier.__RaiseVerifyError(f'invalid characters in - {key}\nCharacters: {invalidCharacters}')
-                if not key.startswith("PU_") and not key.startswith("PH_PU_") and not key.startswith("DXSM_"):
-                    origUnnamedFormats = LocalizationIni.GetUnnamedFormats(value)
-                    translateUnnamedFormats = LocalizationIni.GetUnnamedFormats(translateValue)
-                    if origUnnamedFormats != translateUnnamedFormats:
-                        LocalizationVerifier.__RaiseVerifyError(f'unnamed format seq change - {key}\nFormat original : {origUnnamedFormats}\nFormat translate : {translateUnnamedFormats}')
-                origNamedFormats = LocalizationIni.GetNamedFormats(value)
-                translateNamedFormats = LocalizationIni.GetNamedFormats(translateValue)
-                if not LocalizationIni.IsNamedFormatEquals(origNamedFormats, translateNamedFormats):
-                    LocalizationVerifier.__RaiseVerifyError(f'named format seq change - {key}\nFormat original : {LocalizationVerifier.__NamedFormatToString(origNamedFormats)}\nFormat translate : {LocalizationVerifier.__NamedFormatToString(translateNamedFormats)}')
-                if self.lostNewline:
-                    count = len(LocalizationVerifier.__lostNewlineExpr.findall(translateValue))
-                    if count > 0:
-                        print(f"Note: lost newline \\n [{count}] - {key}")
-                if self.spaceBeforeNewline:
-                    count = len(LocalizationVerifier.__spaceBeforeNewlineExpr.findall(translateValue))
-                    if count > 0:
-                        print(f"Note: space before \\n [{count}] - {key}")
-                if self.englishWordsMismatch:
-                    translateCleanValue = LocalizationIni.GetCleanText(translateValue, translateUnnamedFormats, translateNamedFormats)
-                    translateEngWords = LocalizationIni.GetEnglishWords(translateCleanValue)
-                    if len(translateEngWords) > 0:
-                        cleanValue = LocalizationIni.GetCleanText(value, origUnnamedFormats, origNamedFormats)
-                        origEngWords = LocalizationIni.GetEnglishWords(cleanValue)
-                        if not translateEngWords.issubset(origEngWords):
-                            print(f"Note: use undefined word in - {key}")
-                            print("English words original : ", origEngWords)
-                            print("English words translate : ", translateEngWords)
-                            print("English words diff : ", translateEngWords.difference(origEngWords))
+    @staticmethod
+    def __GetMatchedRows(expr, column):
+        text = '\n'.join(column)
+        if text.count('\n') != len(column) - 1:
+            # multi line values, rows can't be told by line
+            return None
+        offsets = list(itertools.accumulate(map(len, column), lambda offset, length: offset + length + 1, initial=0))
+        rows = []
+        match = expr.search(text)
+        while match:
+            row = bisect.bisect_right(offsets, match.start()) - 1
+            rows.append(row)
+            # rest of matched row is skipped
+            match = expr.search(text, offsets[row + 1])
+        return rows
+
+    def getCheckedRows(self, items):
+        """Indexes of (key, value, translateValue) items which may have findings
+
+        Whole columns are scanned at once: translation rows with empty value,
+        format, escape, English letter or not allowed character and source
+        rows with format. Other rows have no findings for sure.
+        """
+        keys, values, translateValues = zip(*items)
+        translationRows = LocalizationVerifier.__GetMatchedRows(self.__getRowsExpr(), translateValues)
+        sourceRows = LocalizationVerifier.__GetMatchedRows(LocalizationVerifier.__sourceRowsExpr, values)
+        if translationRows is None or sourceRows is None:
+            return list(range(len(items)))
+        emptyRows = itertools.compress(itertools.count(), map(operator.not_, translateValues))
+        return sorted(set(translationRows).union(sourceRows, emptyRows))
+
+    def __iterItemsFindings(self, items, jobs, originalIni):
+        if not self.columnsBackend or not items:
+            yield from self.__iterLoopItemsFindings(items, jobs, originalIni)
+            return
+        checkedRows = self.getCheckedRows(items)
+        checkedFindings = self.__iterLoopItemsFindings([ items[row] for row in checkedRows ], jobs, originalIni)
+        nextRow = 0
+        for row in checkedRows:
+            while nextRow < row:
+                yield []
+                nextRow += 1
+            yield next(checkedFindings)
+            nextRow += 1
+        for row in range(nextRow, len(items)):
+            yield []
+
+    def __iterLoopItemsFindings(self, items, jobs, originalIni):
+        if (jobs <= 1) or (len(items) < LocalizationVerifier.__minShardedItems):
+            # source signatures stay in original ini index for following merge
+            for key, value, translateValue in items:
+                yield self.verifyValue(key, value, translateValue, originalIni.getFormatSignature(key))
+            return
+        import concurrent.futures
+        shardsCount = jobs * LocalizationVerifier.__shardsPerJob
+        shardSize = (len(items) + shardsCount - 1) // shardsCount
+        shards = [items[index:index + shardSize] for index in range(0, len(items), shardSize)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(jobs, len(shards))) as executor:
+            # map keeps submission order, so findings come back in key order
+            for shardFindings in executor.map(self.verifyItems, shards):
+                yield from shardFindings
+
+    def __iterCachedItemsFindings(self, cache, items, jobs, originalIni):
+        from modules.cache import VerdictCache
+        optionsDigest = self.getOptionsDigest()
+        verdicts = cache.load(optionsDigest)
+        digests = [ VerdictCache.GetItemDigest(*item) for item in items ]
+        pendingItems = [ item for item, digest in zip(items, digests) if digest not in verdicts ]
+        cache.hits += len(items) - len(pendingItems)
+        cache.misses += len(pendingItems)
+        pendingFindings = self.__iterItemsFindings(pendingItems, jobs, originalIni)
+        newVerdicts = {}
+        for digest in digests:
+            findings = verdicts.get(digest)
+            if findings is None:
+                findings = next(pendingFindings)
+            newVerdicts[digest] = findings
+            yield findings
+        cache.save(optionsDigest, newVerdicts)
+
+    def verify(self, originalIni, translationIni, jobs=1):
+        with Profiler.Stage('verify') as stage:
+            items = []
+            for key, value in originalIni.getItems():
+                translateValue = translationIni.getKeyValue(key)
+                if translateValue != None:
+                    items.append((key, value, translateValue))
+            stage.setItems(len(items))
+            cache = LocalizationVerifier.__verdictCache
+            if cache is None:
+                itemsFindings = self.__iterItemsFindings(items, jobs, originalIni)
+            else:
+                itemsFindings = self.__iterCachedItemsFindings(cache, items, jobs, originalIni)
+            report = LocalizationVerifier.__report or Report()
+            for findings in itemsFindings:
+                for finding in findings:
+                    report.add(finding)
+                    if finding.level == 'error':
+                        if LocalizationVerifier.__verifyExceptions:
+                            report.flush()
+                            raise Exception(f'Error: {finding.getMessage()}')
+                        if LocalizationVerifier.__interactiveMode:
+                            report.flush()
+                            input()
+            report.flush()
 
     @staticmethod
     def SetEnableVerifyExceptions(enabled):
@@ -481,4 +1094,26 @@ class LocalizationVerifier:
     def SetInteractiveMode(enabled):
         LocalizationVerifier.__interactiveMode = enabled
 
+    @staticmethod
+    def SetVerdictCache(cache):
+        LocalizationVerifier.__verdictCache = cache
+
+    @staticmethod
+    def GetVerdictCache():
+        return LocalizationVerifier.__verdictCache
+
+    @staticmethod
+    def SetReport(report):
+        LocalizationVerifier.__report = report
+
+    @staticmethod
+    def GetCounters():
+        """Counters of caches reported by profiler"""
+        cache = LocalizationVerifier.__verdictCache
+        if cache is None:
+            return {}
+        return { 'verdict-cache.hits': cache.hits, 'verdict-cache.misses': cache.misses }
+
+Profiler.Register(LocalizationIni, LocalizationVerifier)
+
 
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import time
+import collections
+
+# tracemalloc, cProfile and json are imported only when profiling is enabled
+
+class CountingPattern:
+    """Compiled regular expression which counts its evaluations, installed only while profiling"""
+
+    __slots__ = ('pattern', 'counter', 'name')
+
+    def __init__(self, pattern, counter, name):
+        self.pattern = pattern
+        self.counter = counter
+        self.name = name
+
+    def __getattr__(self, name):
+        return getattr(self.pattern, name)
+
+    def __reduce__(self):
+        # worker processes get plain pattern, their evaluations are not counted
+        return (re.compile, (self.pattern.pattern, self.pattern.flags))
+
+    def search(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.search(*args)
+
+    def match(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.match(*args)
+
+    def fullmatch(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.fullmatch(*args)
+
+    def findall(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.findall(*args)
+
+    def finditer(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.finditer(*args)
+
+    def sub(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.sub(*args)
+
+    def split(self, *args):
+        self.counter[self.name] += 1
+        return self.pattern.split(*args)
+
+class ProfileStage:
+    """Span of one named stage, nested stages are kept with their depth"""
+
+    def __init__(self, name, depth, cprofile):
+        self.name = name
+        self.depth = depth
+        self.items = None
+        self.wallTime = 0.0
+        self.cpuTime = 0.0
+        self.peakMemory = 0
+        self.cprofile = cprofile
+
+    def setItems(self, count):
+        self.items = count
+
+    def __enter__(self):
+        import tracemalloc
+        Profiler.PushStage(self)
+        self.startMemory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        if self.cprofile:
+            self.cprofile.enable()
+        self.startWallTime = time.perf_counter()
+        self.startCpuTime = time.process_time()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        import tracemalloc
+        self.wallTime = time.perf_counter() - self.startWallTime
+        self.cpuTime = time.process_time() - self.startCpuTime
+        if self.cprofile:
+            self.cprofile.disable()
+        self.peakMemory = max(self.peakMemory, tracemalloc.get_traced_memory()[1])
+        Profiler.PopStage(self)
+        return False
+
+    def toDict(self):
+        return { 'name': self.name, 'depth': self.depth, 'wall_time': round(self.wallTime, 6), 'cpu_time': round(self.cpuTime, 6),
+                 'peak_memory': self.peakMemory, 'start_memory': self.startMemory, 'items': self.items }
+
+class NoProfileStage:
+    """Stage used while profiling is disabled, does nothing"""
+
+    def setItems(self, count):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+class Profiler:
+    """Stages and counters of one run enabled by --profile
+
+    Stages are named spans with wall time, CPU time, peak traced memory and
+    optional count of processed items. Counters are collected from classes
+    registered by modules: their compiled regular expressions are replaced
+    by counting wrappers while profiling and their GetCounters results (cache
+    hits and misses) are added to summary. While disabled Stage returns shared
+    no-op stage and registered classes are not changed. Work done in worker
+    processes is included in stage times of parent process only.
+    """
+
+    __enabled = False
+    __noStage = NoProfileStage()
+    __stack = []
+    __stages = []
+    __counters = collections.Counter()
+    __owners = []
+    __cprofileStage = None
+    __cprofile = None
+    __startWallTime = 0.0
+    __startCpuTime = 0.0
+    __peakMemory = 0
+
+    @staticmethod
+    def Register(*owners):
+        """Register classes with compiled patterns and GetCounters static method"""
+        for owner in owners:
+            Profiler.__owners.append(owner)
+            if Profiler.__enabled:
+                Profiler.InstrumentPatterns(owner)
+
+    @staticmethod
+    def InstrumentPatterns(owner):
+        ownerName = owner.__name__ if isinstance(owner, type) else type(owner).__name__
+        attributes = vars(owner)
+        for attributeName, value in list(attributes.items()):
+            if isinstance(value, re.Pattern):
+                # private names are mangled, counters use names as written in class
+                name = attributeName.split('__', 1)[-1] if attributeName.startswith('_') else attributeName
+                setattr(owner, attributeName, CountingPattern(value, Profiler.__counters, f'regex.{ownerName}.{name}'))
+
+    @staticmethod
+    def Enable(cprofileStage=None):
+        import tracemalloc
+        Profiler.__enabled = True
+        Profiler.__cprofileStage = cprofileStage
+        if cprofileStage:
+            import cProfile
+            Profiler.__cprofile = cProfile.Profile()
+        for owner in Profiler.__owners:
+            Profiler.InstrumentPatterns(owner)
+        tracemalloc.start()
+        Profiler.__startWallTime = time.perf_counter()
+        Profiler.__startCpuTime = time.process_time()
+
+    @staticmethod
+    def IsEnabled():
+        return Profiler.__enabled
+
+    @staticmethod
+    def Stage(name):
+        if not Profiler.__enabled:
+            return Profiler.__noStage
+        cprofile = Profiler.__cprofile if name == Profiler.__cprofileStage else None
+        return ProfileStage(name, len(Profiler.__stack), cprofile)
+
+    @staticmethod
+    def PushStage(stage):
+        import tracemalloc
+        # peak is reset for each stage, so parent and run keep peak reached so far
+        peakMemory = tracemalloc.get_traced_memory()[1]
+        Profiler.__peakMemory = max(Profiler.__peakMemory, peakMemory)
+        if Profiler.__stack:
+            parent = Profiler.__stack[-1]
+            parent.peakMemory = max(parent.peakMemory, peakMemory)
+        Profiler.__stack.append(stage)
+        Profiler.__stages.append(stage)
+
+    @staticmethod
+    def PopStage(stage):
+        Profiler.__stack.remove(stage)
+        Profiler.__peakMemory = max(Profiler.__peakMemory, stage.peakMemory)
+        if Profiler.__stack:
+            parent = Profiler.__stack[-1]
+            parent.peakMemory = max(parent.peakMemory, stage.peakMemory)
+
+    @staticmethod
+    def Count(name, count=1):
+        if Profiler.__enabled:
+            Profiler.__counters[name] += count
+
+    @staticmethod
+    def GetSummary():
+        import tracemalloc
+        counters = collections.Counter(Profiler.__counters)
+        for owner in Profiler.__owners:
+            getCounters = getattr(owner, 'GetCounters', None)
+            if getCounters:
+                counters.update(getCounters())
+        return {
+            'wall_time': round(time.perf_counter() - Profiler.__startWallTime, 6),
+            'cpu_time': round(time.process_time() - Profiler.__startCpuTime, 6),
+            'peak_memory': max(Profiler.__peakMemory, tracemalloc.get_traced_memory()[1]),
+            'stages': [ stage.toDict() for stage in Profiler.__stages ],
+            'counters': dict(sorted(counters.items())),
+        }
+
+    @staticmethod
+    def Save(filename):
+        """Write JSON summary and print stages, cProfile stats of chosen stage are written next to summary"""
+        if not Profiler.__enabled:
+            return
+        import json
+        summary = Profiler.GetSummary()
+        with open(filename, 'w', encoding='utf-8') as outputFile:
+            json.dump(summary, outputFile, indent=2)
+        print(f'Profile: {summary["wall_time"]:.3f}s wall, {summary["cpu_time"]:.3f}s CPU, {summary["peak_memory"] / 1048576:.1f} MiB peak -> {filename}')
+        for stage in summary['stages']:
+            items = f', {stage["items"]} items' if stage['items'] is not None else ''
+            print('  {0}{1}: {2:.3f}s wall, {3:.3f}s CPU, {4:.1f} MiB peak{5}'.format('  ' * stage['depth'], stage['name'], stage['wall_time'],
+                                                                                    stage['cpu_time'], stage['peak_memory'] / 1048576, items))
+        if Profiler.__cprofile:
+            cprofileFilename = os.path.splitext(filename)[0] + f'.{Profiler.__cprofileStage}.prof'
+            Profiler.__cprofile.dump_stats(cprofileFilename)
+            print(f'  cProfile of {Profiler.__cprofileStage} -> {cprofileFilename}')
+        sys.stdout.flush()
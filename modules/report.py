@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import collections
+
+# json is imported on first JSONL write to keep startup of console runs fast
+
+def FormatSet(values):
+    """Set style text of sorted values, stable between runs unlike repr of set"""
+    if not values:
+        return 'set()'
+    return '{' + ', '.join(repr(value) for value in sorted(values)) + '}'
+
+def FormatNamedFormats(formats):
+    return ', '.join(f'~{name}({args})' for name, args in formats)
+
+class Finding(collections.namedtuple('Finding', [ 'level', 'rule', 'key', 'details' ])):
+    """One finding of verify, merge or transform
+
+    Attributes:
+        level -- error, warning, note or info
+        rule -- name of rule which produced finding
+        key -- localization key
+        details -- JSON serializable dict with rule specific values
+    """
+
+    __slots__ = ()
+
+    __levelPrefixes = {
+        'error': 'Error: ',
+        'warning': 'Warning: ',
+        'note': 'Note: ',
+        'info': 'Info: ',
+    }
+
+    # console messages of rules, formatted only when rendered
+    __messages = {
+        'empty-translation': lambda key, details: f'empty translation - {key}',
+        'invalid-characters': lambda key, details: f'invalid characters in - {key}\nCharacters: {FormatSet(details["characters"])}',
+        'unnamed-format': lambda key, details: f'unnamed format seq change - {key}\nFormat original : {details["original"]}\nFormat translate : {details["translate"]}',
+        'named-format': lambda key, details: f'named format seq change - {key}\nFormat original : {FormatNamedFormats(details["original"])}\nFormat translate : {FormatNamedFormats(details["translate"])}',
+        'lost-newline': lambda key, details: f'lost newline \\n [{details["count"]}] - {key}',
+        'space-before-newline': lambda key, details: f'space before \\n [{details["count"]}] - {key}',
+        'english-words': lambda key, details: f'use undefined word in - {key}\n'
+                                              f'English words original :  {FormatSet(details["original"])}\n'
+                                              f'English words translate :  {FormatSet(details["translate"])}\n'
+                                              f'English words diff :  {FormatSet(details["diff"])}',
+        'outdated-translation': lambda key, details: f'outdated translation key used: {key}',
+        'reference-used': lambda key, details: f'reference key used: {key}',
+        'exclude-translate-key': lambda key, details: f'exclude translate key: {key}',
+        'exclude-inner-thought': lambda key, details: f'exclude inner thought key: {key}',
+        'version-added': lambda key, details: f'Added version to key: {key}',
+        'replace-characters': lambda key, details: f'replace characters in key: {key} {FormatSet(details["characters"])}',
+    }
+
+    def getMessage(self):
+        return Finding.__messages[self.rule](self.key, self.details)
+
+    def getText(self):
+        return Finding.__levelPrefixes[self.level] + self.getMessage()
+
+    def toJson(self):
+        import json
+        return json.dumps({ 'key': self.key, 'rule': self.rule, 'level': self.level, 'details': self.details }, ensure_ascii=False)
+
+class Report:
+    """Sink of findings
+
+    Findings are counted per rule and kept in a batch, which is written at
+    once to JSONL file and rendered to console when full or on flush. With
+    console disabled and no JSONL file findings are only counted and no
+    text is formatted at all. Callers flush before printing own output to
+    keep order of console lines.
+    """
+
+    def __init__(self, console=True, jsonlFilename=None, batchSize=4096):
+        self.console = console
+        self.batchSize = batchSize
+        self.counts = collections.Counter()
+        self.__batch = []
+        self.__jsonlFile = None
+        if jsonlFilename:
+            self.__jsonlFile = open(jsonlFilename, 'w', encoding='utf-8', newline='\n')
+
+    def add(self, finding):
+        self.counts[finding.rule] += 1
+        if self.console or self.__jsonlFile:
+            self.__batch.append(finding)
+            if len(self.__batch) >= self.batchSize:
+                self.flush()
+
+    def extend(self, findings):
+        for finding in findings:
+            self.add(finding)
+
+    def flush(self):
+        if not self.__batch:
+            return
+        if self.console:
+            sys.stdout.write(''.join(finding.getText() + '\n' for finding in self.__batch))
+            sys.stdout.flush()
+        if self.__jsonlFile:
+            self.__jsonlFile.write(''.join(finding.toJson() + '\n' for finding in self.__batch))
+        self.__batch.clear()
+
+    def getSummary(self):
+        return dict(sorted(self.counts.items()))
+
+    def printSummary(self):
+        self.flush()
+        summary = self.getSummary()
+        if summary:
+            print('Findings: ' + ', '.join(f'{rule} {count}' for rule, count in summary.items()))
+
+    def close(self):
+        self.flush()
+        if self.__jsonlFile:
+            import json
+            self.__jsonlFile.write(json.dumps({ 'summary': self.getSummary() }, ensure_ascii=False) + '\n')
+            self.__jsonlFile.close()
+            self.__jsonlFile = None
+
+class KeyedReport(Report):
+    """Report which also keeps findings of each key
+
+    Used by watch mode: findings of changed keys are discarded before they
+    are checked again, so counts always describe current documents.
+    """
+
+    def __init__(self, console=True, jsonlFilename=None, batchSize=4096):
+        super().__init__(console, jsonlFilename, batchSize)
+        self.__keyFindings = collections.defaultdict(list)
+
+    def add(self, finding):
+        self.__keyFindings[finding.key].append(finding)
+        super().add(finding)
+
+    def discard(self, keys):
+        for key in keys:
+            for finding in self.__keyFindings.pop(key, ()):
+                self.counts[finding.rule] -= 1
+                if self.counts[finding.rule] <= 0:
+                    del self.counts[finding.rule]
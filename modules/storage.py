@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import array
+
+class CompactStorage:
+    """Insertion ordered str -> str mapping packed into contiguous buffers
+
+    Keys and values are stored UTF-8 encoded in two byte buffers and are
+    addressed by offset arrays. Lookup uses an open addressing hash index
+    with entry numbers instead of per item Python objects, so one entry costs
+    its encoded size plus a few dozen bytes. Overwritten values are appended
+    and the value buffer is repacked once garbage exceeds the live data.
+
+    Supports the subset of dict API used by LocalizationIni: items, keys,
+    get, update, len, in, iteration and item assignment.
+    """
+
+    __minCapacity = 8
+    __emptySlot = -1
+
+    def __init__(self, items=()):
+        self.__keys = bytearray()
+        self.__keyOffsets = array.array('I', [0])
+        self.__values = bytearray()
+        self.__valueStarts = array.array('I')
+        self.__valueEnds = array.array('I')
+        self.__garbageSize = 0
+        self.__hashes = array.array('q')
+        self.__slots = array.array('i', [CompactStorage.__emptySlot]) * CompactStorage.__minCapacity
+        self.update(items)
+
+    def __findSlot(self, keyHash, encodedKey):
+        slots = self.__slots
+        mask = len(slots) - 1
+        slot = keyHash & mask
+        while True:
+            index = slots[slot]
+            if index == CompactStorage.__emptySlot:
+                return slot, index
+            if self.__hashes[index] == keyHash and self.__keys[self.__keyOffsets[index]:self.__keyOffsets[index + 1]] == encodedKey:
+                return slot, index
+            slot = (slot + 1) & mask
+
+    def __resize(self, capacity):
+        slots = array.array('i', [CompactStorage.__emptySlot]) * capacity
+        mask = capacity - 1
+        for index, keyHash in enumerate(self.__hashes):
+            slot = keyHash & mask
+            while slots[slot] != CompactStorage.__emptySlot:
+                slot = (slot + 1) & mask
+            slots[slot] = index
+        self.__slots = slots
+
+    def __repackValues(self):
+        values = bytearray()
+        for index in range(len(self.__valueStarts)):
+            start = len(values)
+            values += self.__values[self.__valueStarts[index]:self.__valueEnds[index]]
+            self.__valueStarts[index] = start
+            self.__valueEnds[index] = len(values)
+        self.__values = values
+        self.__garbageSize = 0
+
+    def __getValue(self, index):
+        return self.__values[self.__valueStarts[index]:self.__valueEnds[index]].decode('utf-8')
+
+    def __getKey(self, index):
+        return self.__keys[self.__keyOffsets[index]:self.__keyOffsets[index + 1]].decode('utf-8')
+
+    def __getstate__(self):
+        # str hashes are salted per process, so the index is rebuilt on load
+        state = self.__dict__.copy()
+        del state['_CompactStorage__hashes']
+        del state['_CompactStorage__slots']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__hashes = array.array('q', (hash(self.__getKey(index)) for index in range(len(self.__valueStarts))))
+        capacity = CompactStorage.__minCapacity
+        while len(self.__hashes) * 3 >= capacity * 2:
+            capacity *= 2
+        self.__resize(capacity)
+
+    def __len__(self):
+        return len(self.__hashes)
+
+    def __contains__(self, key):
+        return self.__findSlot(hash(key), key.encode('utf-8'))[1] != CompactStorage.__emptySlot
+
+    def __iter__(self):
+        for index in range(len(self.__hashes)):
+            yield self.__getKey(index)
+
+    def __setitem__(self, key, value):
+        keyHash = hash(key)
+        encodedKey = key.encode('utf-8')
+        encodedValue = value.encode('utf-8')
+        slot, index = self.__findSlot(keyHash, encodedKey)
+        if index != CompactStorage.__emptySlot:
+            self.__garbageSize += self.__valueEnds[index] - self.__valueStarts[index]
+            self.__valueStarts[index] = len(self.__values)
+            self.__values += encodedValue
+            self.__valueEnds[index] = len(self.__values)
+            if self.__garbageSize > len(self.__values) // 2:
+                self.__repackValues()
+            return
+        self.__slots[slot] = len(self.__hashes)
+        self.__hashes.append(keyHash)
+        self.__keys += encodedKey
+        self.__keyOffsets.append(len(self.__keys))
+        self.__valueStarts.append(len(self.__values))
+        self.__values += encodedValue
+        self.__valueEnds.append(len(self.__values))
+        if len(self.__hashes) * 3 >= len(self.__slots) * 2:
+            self.__resize(len(self.__slots) * 2)
+
+    def get(self, key, default=None):
+        index = self.__findSlot(hash(key), key.encode('utf-8'))[1]
+        if index == CompactStorage.__emptySlot:
+            return default
+        return self.__getValue(index)
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for index in range(len(self.__hashes)):
+            yield self.__getKey(index), self.__getValue(index)
+
+    def update(self, items):
+        if hasattr(items, 'items'):
+            items = items.items()
+        for key, value in items:
+            self[key] = value
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import time
+import posixpath
+import zipfile
+import concurrent.futures
+import xml.etree.cElementTree as ET
+from modules.profiler import Profiler
+
+class XlsxFormatError(Exception):
+    """Exception raised for malformed or unsupported XLSX documents."""
+    pass
+
+class XlsxReader:
+    """Streaming reader of XLSX worksheet cell strings
+
+    Reads package parts straight from the zip archive. Shared strings are
+    kept in memory as a list, worksheet rows are parsed incrementally and
+    released right after they are yielded, so memory doesn't depend on
+    number of rows.
+    """
+
+    __relationshipsNs = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    __officeDocumentType = '/officeDocument'
+    __sharedStringsType = '/sharedStrings'
+    __escapeExpr = re.compile('_x([0-9A-Fa-f]{4})_')
+
+    @staticmethod
+    def __LocalName(tag):
+        return tag.rsplit('}', 1)[-1]
+
+    @staticmethod
+    def __ColumnIndex(cellRef):
+        index = 0
+        for ch in cellRef:
+            if 'A' <= ch <= 'Z':
+                index = index * 26 + ord(ch) - 64
+            elif 'a' <= ch <= 'z':
+                index = index * 26 + ord(ch) - 96
+            else:
+                break
+        return index - 1
+
+    @staticmethod
+    def __Unescape(text):
+        # OOXML _xHHHH_ escape of characters not allowed in XML, _x005F_ is literal underscore
+        if '_x' not in text:
+            return text
+        return XlsxReader.__escapeExpr.sub(lambda match: chr(int(match.group(1), 16)), text)
+
+    @staticmethod
+    def __ElementText(element):
+        # concatenate rich text runs, skip phonetic hints
+        text = ''
+        for child in element:
+            name = XlsxReader.__LocalName(child.tag)
+            if name == 't':
+                text += child.text or ''
+            elif name == 'r':
+                for runChild in child:
+                    if XlsxReader.__LocalName(runChild.tag) == 't':
+                        text += runChild.text or ''
+        return XlsxReader.__Unescape(text)
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.__zipFile = zipfile.ZipFile(filename)
+        self.__sharedStrings = None
+        self.__sheets = {}
+        self.__sharedStringsPath = None
+        self.__readWorkbook()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def close(self):
+        self.__zipFile.close()
+
+    def __readRelationships(self, partPath):
+        relsPath = posixpath.join(posixpath.dirname(partPath), '_rels', posixpath.basename(partPath) + '.rels')
+        relationships = {}
+        try:
+            root = ET.fromstring(self.__zipFile.read(relsPath))
+        except KeyError:
+            return relationships
+        for relationship in root:
+            target = relationship.get('Target', '')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(posixpath.dirname(partPath), target))
+            relationships[relationship.get('Id')] = (relationship.get('Type', ''), target)
+        return relationships
+
+    def __readWorkbook(self):
+        workbookPath = 'xl/workbook.xml'
+        for relType, target in self.__readRelationships('').values():
+            if relType.endswith(XlsxReader.__officeDocumentType):
+                workbookPath = target
+        relationships = self.__readRelationships(workbookPath)
+        for relType, target in relationships.values():
+            if relType.endswith(XlsxReader.__sharedStringsType):
+                self.__sharedStringsPath = target
+        try:
+            root = ET.fromstring(self.__zipFile.read(workbookPath))
+        except KeyError:
+            raise XlsxFormatError(f'Missing workbook in {self.filename}')
+        for element in root.iter():
+            if XlsxReader.__LocalName(element.tag) == 'sheet':
+                relationshipId = element.get('{' + XlsxReader.__relationshipsNs + '}id')
+                if relationshipId is None:
+                    relationshipId = next((v for k, v in element.attrib.items() if k.endswith('}id')), None)
+                if relationshipId in relationships:
+                    self.__sheets[element.get('name')] = relationships[relationshipId][1]
+
+    def __readSharedStrings(self):
+        sharedStrings = []
+        if self.__sharedStringsPath:
+            with self.__zipFile.open(self.__sharedStringsPath) as inputFile:
+                root = None
+                for event, element in ET.iterparse(inputFile, events=('start', 'end')):
+                    if event == 'start':
+                        if root is None:
+                            root = element
+                    elif XlsxReader.__LocalName(element.tag) == 'si':
+                        sharedStrings.append(XlsxReader.__ElementText(element))
+                        root.clear()
+        return sharedStrings
+
+    def getSheetNames(self):
+        return list(self.__sheets)
+
+    def __cellValue(self, cell):
+        cellType = cell.get('t')
+        if cellType == 'inlineStr':
+            for child in cell:
+                if XlsxReader.__LocalName(child.tag) == 'is':
+                    return XlsxReader.__ElementText(child)
+            return None
+        value = None
+        for child in cell:
+            if XlsxReader.__LocalName(child.tag) == 'v':
+                value = child.text
+                break
+        if value is None:
+            return None
+        if cellType == 's':
+            return self.__sharedStrings[int(value)]
+        return value
+
+    def iterRows(self, sheetName):
+        """Yield (row number, list of cell strings) for each row of the sheet.
+
+        Row numbers are 1-based sheet row numbers, cells are indexed by
+        column (A is 0). Missing and empty cells are None.
+        """
+        if sheetName not in self.__sheets:
+            raise XlsxFormatError(f"Worksheet named '{sheetName}' not found")
+        if self.__sharedStrings is None:
+            self.__sharedStrings = self.__readSharedStrings()
+        with self.__zipFile.open(self.__sheets[sheetName]) as inputFile:
+            sheetData = None
+            rowNumber = 0
+            for event, element in ET.iterparse(inputFile, events=('start', 'end')):
+                name = XlsxReader.__LocalName(element.tag)
+                if event == 'start':
+                    if name == 'sheetData':
+                        sheetData = element
+                    continue
+                if name != 'row':
+                    continue
+                rowRef = element.get('r')
+                rowNumber = int(rowRef) if rowRef else rowNumber + 1
+                cells = []
+                for cell in element:
+                    if XlsxReader.__LocalName(cell.tag) != 'c':
+                        continue
+                    cellRef = cell.get('r')
+                    columnIndex = XlsxReader.__ColumnIndex(cellRef) if cellRef else len(cells)
+                    value = self.__cellValue(cell)
+                    if value == '':
+                        value = None
+                    while len(cells) < columnIndex:
+                        cells.append(None)
+                    if columnIndex == len(cells):
+                        cells.append(value)
+                    else:
+                        cells[columnIndex] = value
+                yield rowNumber, cells
+                if sheetData is not None:
+                    sheetData.clear()
+
+class XlsxWriter:
+    """Write-only streaming XLSX writer of single worksheet with string cells
+
+    Rows are serialized into the compressed worksheet part as they are
+    appended. Equal strings are stored once in the shared strings table,
+    which is the only data kept in memory until close.
+    """
+
+    __mainNs = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+    __relationshipsNs = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+    __packageRelationshipsNs = 'http://schemas.openxmlformats.org/package/2006/relationships'
+    __xmlHeader = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    __controlCharactersExpr = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+    __escapeLikeExpr = re.compile('_(x[0-9A-Fa-f]{4}_)')
+    __flushSize = 1 << 16
+    # fixed entry timestamp makes output depend only on content
+    __entryDateTime = (1980, 1, 1, 0, 0, 0)
+    __contentTypes = (__xmlHeader +
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>')
+    __rootRelationships = (__xmlHeader +
+        f'<Relationships xmlns="{__packageRelationshipsNs}">'
+        f'<Relationship Id="rId1" Type="{__relationshipsNs}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>')
+    __workbookRelationships = (__xmlHeader +
+        f'<Relationships xmlns="{__packageRelationshipsNs}">'
+        f'<Relationship Id="rId1" Type="{__relationshipsNs}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{__relationshipsNs}/sharedStrings" Target="sharedStrings.xml"/>'
+        f'<Relationship Id="rId3" Type="{__relationshipsNs}/styles" Target="styles.xml"/>'
+        '</Relationships>')
+    __styles = (__xmlHeader +
+        f'<styleSheet xmlns="{__mainNs}">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>')
+
+    @staticmethod
+    def __Escape(text):
+        text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+        # literal text looking like escape keeps its underscore escaped as _x005F_
+        if '_x' in text:
+            text = XlsxWriter.__escapeLikeExpr.sub(r'_x005F_\1', text)
+        # characters not allowed in XML are stored with OOXML _xHHHH_ escape
+        return XlsxWriter.__controlCharactersExpr.sub(lambda match: f'_x{ord(match.group(0)):04X}_', text)
+
+    @staticmethod
+    def WriteFile(filename, sheetName, rows):
+        """Write rows to XLSX file, returns written rows count and elapsed time"""
+        startTime = time.perf_counter()
+        with XlsxWriter(filename, sheetName) as outputXlsx:
+            for row in rows:
+                outputXlsx.append(row)
+        return len(outputXlsx), time.perf_counter() - startTime
+
+    @staticmethod
+    def WriteFiles(documents, jobs):
+        """Write (filename, sheetName, rows) documents on process pool
+
+        Rows of all documents are built by caller and sent to workers,
+        so memory of whole run is not reduced, only serialization and
+        compression run in parallel. Yields WriteFile results in order of
+        documents.
+        """
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, min(jobs, len(documents)))) as executor:
+            futures = [ executor.submit(XlsxWriter.WriteFile, filename, sheetName, rows) for filename, sheetName, rows in documents ]
+            for future in futures:
+                yield future.result()
+
+    @staticmethod
+    def __EntryInfo(name):
+        entryInfo = zipfile.ZipInfo(name, date_time=XlsxWriter.__entryDateTime)
+        entryInfo.compress_type = zipfile.ZIP_DEFLATED
+        return entryInfo
+
+    @staticmethod
+    def __ColumnName(columnIndex):
+        name = ''
+        columnIndex += 1
+        while columnIndex > 0:
+            columnIndex, remainder = divmod(columnIndex - 1, 26)
+            name = chr(65 + remainder) + name
+        return name
+
+    def __init__(self, filename, sheetName):
+        self.filename = filename
+        self.sheetName = sheetName
+        self.__zipFile = zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.__sheetFile = self.__zipFile.open(XlsxWriter.__EntryInfo('xl/worksheets/sheet1.xml'), 'w', force_zip64=True)
+        self.__sharedStrings = {}
+        self.__stringsCount = 0
+        self.__rowsCount = 0
+        self.__columnNames = []
+        self.__buffer = []
+        self.__bufferSize = 0
+        self.__write(XlsxWriter.__xmlHeader + f'<worksheet xmlns="{XlsxWriter.__mainNs}" xmlns:r="{XlsxWriter.__relationshipsNs}"><sheetData>')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self):
+        return self.__rowsCount
+
+    def __write(self, text):
+        self.__buffer.append(text)
+        self.__bufferSize += len(text)
+        if self.__bufferSize >= XlsxWriter.__flushSize:
+            self.__flush()
+
+    def __flush(self):
+        if self.__buffer:
+            self.__sheetFile.write(''.join(self.__buffer).encode('utf-8'))
+            self.__buffer = []
+            self.__bufferSize = 0
+
+    def append(self, row):
+        """Append row of cell strings, None and empty strings are left blank."""
+        self.__rowsCount += 1
+        rowNumber = self.__rowsCount
+        sharedStrings = self.__sharedStrings
+        cells = [f'<row r="{rowNumber}">']
+        for columnIndex, value in enumerate(row):
+            if not value:
+                continue
+            while columnIndex >= len(self.__columnNames):
+                self.__columnNames.append(XlsxWriter.__ColumnName(len(self.__columnNames)))
+            stringIndex = sharedStrings.get(value)
+            if stringIndex is None:
+                stringIndex = len(sharedStrings)
+                sharedStrings[value] = stringIndex
+            self.__stringsCount += 1
+            cells.append(f'<c r="{self.__columnNames[columnIndex]}{rowNumber}" t="s"><v>{stringIndex}</v></c>')
+        cells.append('</row>')
+        self.__write(''.join(cells))
+
+    def __writeSharedStrings(self):
+        with self.__zipFile.open(XlsxWriter.__EntryInfo('xl/sharedStrings.xml'), 'w', force_zip64=True) as outputFile:
+            buffer = [XlsxWriter.__xmlHeader + f'<sst xmlns="{XlsxWriter.__mainNs}" count="{self.__stringsCount}" uniqueCount="{len(self.__sharedStrings)}">']
+            bufferSize = 0
+            for value in self.__sharedStrings:
+                text = XlsxWriter.__Escape(value)
+                if text[:1].isspace() or text[-1:].isspace():
+                    buffer.append(f'<si><t xml:space="preserve">{text}</t></si>')
+                else:
+                    buffer.append(f'<si><t>{text}</t></si>')
+                bufferSize += len(text)
+                if bufferSize >= XlsxWriter.__flushSize:
+                    outputFile.write(''.join(buffer).encode('utf-8'))
+                    buffer = []
+                    bufferSize = 0
+            buffer.append('</sst>')
+            outputFile.write(''.join(buffer).encode('utf-8'))
+
+    def abort(self):
+        """Close without writing remaining parts and delete partially written file"""
+        if self.__sheetFile is None:
+            return
+        self.__sheetFile.close()
+        self.__sheetFile = None
+        self.__sharedStrings = {}
+        self.__zipFile.close()
+        os.remove(self.filename)
+
+    def close(self):
+        if self.__sheetFile is None:
+            return
+        with Profiler.Stage('close-xlsx') as stage:
+            stage.setItems(len(self))
+            self.__close()
+
+    def __close(self):
+        self.__write('</sheetData></worksheet>')
+        self.__flush()
+        self.__sheetFile.close()
+        self.__sheetFile = None
+        self.__writeSharedStrings()
+        self.__sharedStrings = {}
+        self.__zipFile.writestr(XlsxWriter.__EntryInfo('xl/workbook.xml'), XlsxWriter.__xmlHeader +
+            f'<workbook xmlns="{XlsxWriter.__mainNs}" xmlns:r="{XlsxWriter.__relationshipsNs}">'
+            f'<sheets><sheet name="{XlsxWriter.__Escape(self.sheetName)}" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        self.__zipFile.writestr(XlsxWriter.__EntryInfo('xl/_rels/workbook.xml.rels'), XlsxWriter.__workbookRelationships)
+        self.__zipFile.writestr(XlsxWriter.__EntryInfo('xl/styles.xml'), XlsxWriter.__styles)
+        self.__zipFile.writestr(XlsxWriter.__EntryInfo('_rels/.rels'), XlsxWriter.__rootRelationships)
+        self.__zipFile.writestr(XlsxWriter.__EntryInfo('[Content_Types].xml'), XlsxWriter.__contentTypes)
+        self.__zipFile.close()
@@ -8,8 +8,11 @@ import sys
 import argparse
 import configparser
 from modules.localization import * 
+from modules.profiler import Profiler
 
 def main(args):
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
     try:
         print(f'Split multi language: {args.file} -> {args.base}, {args.translate}')
         splitDocuments = []
@@ -33,6 +36,9 @@ def main(args):
     except Exception as err:
         print('Error: {0}'.format(err))
         return 1
+    finally:
+        if args.profile:
+            Profiler.Save(args.profile)
     print('Done')
     return 0
 
@@ -43,4 +49,6 @@ if __name__ == "__main__":
     parser.add_argument('-o', '--translate', metavar='OUT_FILENAME', default='global.ini', help='Directs the output of translation to a file name of your choice')
     parser.add_argument('--no-split', action='store_true', default=False, help='Disable support split input documents configured by split-documents section in convert.ini')
     parser.add_argument('--no-errors', action='store_true', default=False, help='Do not allow errors and break after first error')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of stages and write summary to JSON file')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-xliff, load-xlsx-columns, save-ini, ...) and dump it next to profile summary')
     sys.exit(main(parser.parse_args()))
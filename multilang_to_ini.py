@@ -5,150 +5,493 @@
 # - global.ini.xliff [& global_ref.ini] => global.ini
 # - global.ini.original & global.ini.translation [& global_ref.ini] => global.ini
 
+import io
+import os
 import sys
+import time
 import argparse
+import contextlib
 import configparser
 from modules.localization import * 
+from modules.cache import ParseCache, VerdictCache, BuildManifest
+from modules.report import Finding, Report, KeyedReport
+from modules.profiler import Profiler
 
 versionFormat = ' - v{0}'
 versionAddKeys = set(['pause_ForegroundMainMenuScreenName'])
-excludeTranslateKeys = set(['mobiGlas_ui_notification_Party_Title'])
-innerThroughtKeys = None
-innerThroughtExcludeKeys = None
+# sources of tool which define content of output together with inputs
+toolFilenames = [ 'multilang_to_ini.py', 'modules/localization.py', 'modules/storage.py', 'modules/xlsx.py' ]
+excludeTranslateKeys = excludeConfig().keys
+innerThroughtRules = None
+report = Report()
+# shared by all documents converted in one run
+splitDocuments = []
+verifyOptions = {}
+referenceIni = None
+verifier = None
 
-def isInnerThroughtExcludeKey(key):
-    for excludeInnerThroughtKey in innerThroughtExcludeKeys:
-        if key.startswith(excludeInnerThroughtKey):
-            return True
-    return False
+def getInnerThroughtRules():
+    global innerThroughtRules
+    if innerThroughtRules is None:
+        innerThroughtRules = PrefixMatcher.FromRulesFile("inner_throught_keys.txt")
+    return innerThroughtRules
 
 def isInnerThroughtKey(key):
-    global innerThroughtKeys, innerThroughtExcludeKeys
-    if innerThroughtKeys is None:
-        with open("inner_throught_keys.txt", "r") as f:
-            keyRules = f.read().splitlines()
-            innerThroughtKeys = [x[1:] for x in keyRules if x.startswith('+')]
-            innerThroughtExcludeKeys = [x[1:] for x in keyRules if x.startswith('-')]
-    for innerThroughtKey in innerThroughtKeys:
-        if key.startswith(innerThroughtKey):
-            return not isInnerThroughtExcludeKey(key)
-    return False
-
-def compareFormats(refValue, origValue):
-    refFormats = LocalizationIni.GetUnnamedFormats(refValue)
-    origFormats = LocalizationIni.GetUnnamedFormats(origValue)
-    if refFormats != origFormats:
-        return False
-    refFormats = LocalizationIni.GetNamedFormats(refValue)
-    origFormats = LocalizationIni.GetNamedFormats(origValue)
-    return LocalizationIni.IsNamedFormatEquals(refFormats, origFormats)
+    return getInnerThroughtRules().match(key, False)
+
+def compareFormats(refFormats, origFormats):
+    return refFormats.isFormatEquals(origFormats)
 
-def threeWayMerge(key, refValue, origValue, translateValue, args):
+def threeWayMerge(key, refValue, origValue, translateValue, args, originalIni=None):
     if (refValue == origValue):
         return translateValue
-    if not args.no_outdated_translation and compareFormats(refValue, origValue):
-        print(f'Warning: outdated translation key used: {key}')
-        return translateValue
-    print(f'Warning: reference key used: {key}')
+    if not args.no_outdated_translation:
+        origFormats = originalIni.getFormatSignature(key) if originalIni else LocalizationIni.GetFormatSignature(origValue)
+        refFormats = referenceIni.getFormatSignature(key) if referenceIni else LocalizationIni.GetFormatSignature(refValue)
+        if compareFormats(refFormats, origFormats):
+            report.add(Finding('warning', 'outdated-translation', key, {}))
+            return translateValue
+    report.add(Finding('warning', 'reference-used', key, {}))
     return refValue
 
 def isTranslatableKey(key, args):
     if key in excludeTranslateKeys:
-        print(f'Note: exclude translate key: {key}')
+        report.add(Finding('note', 'exclude-translate-key', key, {}))
         return False
     if args.no_inner_thought and isInnerThroughtKey(key):
-        print(f'Note: exclude inner thought key: {key}')
+        report.add(Finding('note', 'exclude-inner-thought', key, {}))
         return False
     return True
 
+def mergeReferenceValue(key, value, originalIni, translateIni, version, args):
+    """Output value of reference key, None when key is not written"""
+    if args.build_import:
+        if translateIni.isContainKey(key) and value == originalIni.getKeyValue(key):
+            return translateIni.getKeyValue(key)
+        return None
+    writeValue = value
+    if translateIni.isContainKey(key) and isTranslatableKey(key, args):
+        writeValue = threeWayMerge(key, value, originalIni.getKeyValue(key), translateIni.getKeyValue(key), args, originalIni)
+    if version and (key in versionAddKeys):
+        writeValue = writeValue + versionFormat.format(version)
+        report.add(Finding('info', 'version-added', key, {}))
+    return writeValue
+
+def mergeReferenceItems(referenceItems, originalIni, translateIni, version, args):
+    """Output (key, value) pairs in order of reference items"""
+    for key, value in referenceItems:
+        writeValue = mergeReferenceValue(key, value, originalIni, translateIni, version, args)
+        if writeValue is not None:
+            yield key, writeValue
+
+def mergeOriginalValue(key, value, originalIni, translateIni, version, args):
+    """Output value of original key, used without reference"""
+    writeValue = value
+    if translateIni.isContainKey(key) and isTranslatableKey(key, args):
+        writeValue = translateIni.getKeyValue(key)
+    if version and (key in versionAddKeys):
+        writeValue = writeValue + versionFormat.format(version)
+        report.add(Finding('info', 'version-added', key, {}))
+    return writeValue
+
+def mergeOriginalItems(originalIni, translateIni, version, args):
+    """Output (key, value) pairs in order of original items, used without reference"""
+    for key, value in originalIni.getItems():
+        yield key, mergeOriginalValue(key, value, originalIni, translateIni, version, args)
+
+def loadDocuments(files):
+    if len(files) == 1:
+        print(f'Process multi language {files[0]}...')
+        inputInis = LocalizationIni.FromMultilang(files[0], splitDocuments)
+        return inputInis[0], inputInis[1]
+    if len(files) == 2:
+        return LocalizationIni.FromIniFile(files[0]), LocalizationIni.FromIniFile(files[1])
+    raise Exception(f'Too many input files specified - {files}')
+
+def printTranslatedStats(originalIni, translateIni):
+    if originalIni.getItemsCount() > 0:
+        print('Translated keys: {0}/{1} ({2:.2f}%)'.format(translateIni.getItemsCount(), originalIni.getItemsCount(),
+                                                           translateIni.getItemsCount() / originalIni.getItemsCount() * 100))
+        print('           left: {0}'.format(originalIni.getItemsCount() - translateIni.getItemsCount()))
+
+def verifyDocuments(originalIni, translateIni, output, args, jobs):
+    print('Check translation...')
+    if not args.no_cache:
+        LocalizationVerifier.SetVerdictCache(VerdictCache(args.cache_dir, os.path.abspath(output), args.recheck))
+    LocalizationVerifier.SetReport(report)
+    getVerifier().verify(originalIni, translateIni, jobs)
+    verdictCache = LocalizationVerifier.GetVerdictCache()
+    if verdictCache:
+        print(f'Verify cache: {verdictCache.hits} reused, {verdictCache.misses} checked')
+
+def convertDocuments(files, output, version, args, jobs):
+    """Load translation documents, check them and write merged output INI
+
+    Uses shared reference, verifier and rules of module, returns numbers
+    of translated and original keys.
+    """
+    with Profiler.Stage('load-documents'):
+        originalIni, translateIni = loadDocuments(files)
+    printTranslatedStats(originalIni, translateIni)
+    if args.check:
+        verifyDocuments(originalIni, translateIni, output, args, jobs)
+    print('Write output...')
+    if args.no_ref:
+        outputItems = mergeOriginalItems(originalIni, translateIni, version, args)
+    else:
+        if args.build_import:
+            print('WARNING: Build import ini mode')
+        outputItems = mergeReferenceItems(referenceIni.getItems() if referenceIni else LocalizationIni.IterIniFile(args.ref),
+                                          originalIni, translateIni, version, args)
+    # merged items are written as they are produced, output is replaced only when complete
+    with Profiler.Stage('merge'):
+        LocalizationIni.SaveItemsToIniFile(output, outputItems)
+    report.flush()
+    return translateIni.getItemsCount(), originalIni.getItemsCount()
+
+def getVerifier():
+    global verifier
+    if verifier is None:
+        verifier = LocalizationVerifier(verifyOptions)
+    return verifier
+
+def getBuildManifest(files, output, version, args):
+    """Build manifest of output with digest of all files and options defining its content"""
+    toolsPath = os.path.dirname(os.path.abspath(__file__))
+    filenames = [ os.path.join(toolsPath, filename) for filename in toolFilenames ] + files
+    if files[0].endswith('.xlsx'):
+        filenames += [ filename for filename, sheetName in getXlsxDocuments(files[0])[1:] ]
+    if not args.no_ref:
+        filenames.append(args.ref)
+    filenames.append('convert.ini')
+    if args.no_inner_thought:
+        filenames.append('inner_throught_keys.txt')
+    options = (version, args.no_ref, args.build_import, args.no_outdated_translation, args.no_inner_thought)
+    return BuildManifest(output, 'multilang_to_ini', BuildManifest.GetInputsDigest(filenames, options))
+
+def getXlsxDocuments(filename):
+    """(filename, sheet name) of main XLSX document and its split documents"""
+    documentsPath = os.path.dirname(os.path.abspath(filename))
+    return [ (filename, 'global.ini') ] + [ (os.path.join(documentsPath, splitFilename + '.xlsx'), splitFilename) for splitFilename in splitDocuments ]
+
+def getWatchedDocuments(files):
+    """(filename, load) of each input document, load returns its original and translate data or None"""
+    if len(files) == 2:
+        return [ (files[0], lambda: (LocalizationIni.FromIniFile(files[0]).data, None)),
+                 (files[1], lambda: (None, LocalizationIni.FromIniFile(files[1]).data)) ]
+    if len(files) > 2:
+        raise Exception(f'Too many input files specified - {files}')
+    if files[0].endswith('.xliff'):
+        return [ (files[0], lambda: tuple(ini.data for ini in LocalizationIni.FromXliffFile(files[0]))) ]
+    if files[0].endswith('.xlsx'):
+        return [ (filename, lambda filename=filename, sheetName=sheetName: tuple(LocalizationIni.LoadXlsxFileColumnsData(filename, sheetName, 2)))
+                 for filename, sheetName in getXlsxDocuments(files[0]) ]
+    raise Exception(f'Unknown input file format {files[0]}')
+
+def getFileState(filename):
+    """Modification time and size of file, None when it is missing"""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def combineDocumentsData(documentsData):
+    """Original and translate INI of all documents, later documents override keys like split documents do"""
+    originalData = {}
+    translateData = {}
+    for documentOriginalData, documentTranslateData in documentsData:
+        if documentOriginalData is not None:
+            originalData.update(documentOriginalData.items())
+        if documentTranslateData is not None:
+            translateData.update(documentTranslateData.items())
+    return LocalizationIni(originalData), LocalizationIni(translateData)
+
+def getChangedKeys(oldData, newData):
+    changedKeys = set(key for key, value in newData.items() if oldData.get(key) != value)
+    changedKeys.update(key for key in oldData if key not in newData)
+    return changedKeys
+
+def mergeChangedKeys(outputValues, changedKeys, originalIni, translateIni, version, args):
+    """Output values with changed keys merged again (all when changedKeys is None), None for keys which are not written"""
+    if args.no_ref:
+        items = originalIni.getItems()
+        mergeValue = mergeOriginalValue
+    else:
+        items = referenceIni.getItems()
+        mergeValue = mergeReferenceValue
+    return { key: mergeValue(key, value, originalIni, translateIni, version, args) if changedKeys is None or key in changedKeys else outputValues[key]
+             for key, value in items }
+
+def saveOutputValues(files, output, version, outputValues, args):
+    LocalizationIni.SaveItemsToIniFile(output, ((key, value) for key, value in outputValues.items() if value is not None))
+    getBuildManifest(files, output, version, args).update()
+
+def watchDocuments(files, output, version, args):
+    """Build output and build it again on each change of input documents until interrupted
+
+    Reference, rules and verifier stay loaded. Documents are polled by
+    modification time and size, only changed document is loaded again and
+    only keys with changed original or translation are verified and merged
+    again, findings and output values of other keys are kept.
+    """
+    documents = getWatchedDocuments(files)
+    states = [ getFileState(filename) for filename, load in documents ]
+    failedStates = [ None ] * len(documents)
+    startTime = time.perf_counter()
+    with Profiler.Stage('load-documents'):
+        documentsData = []
+        for filename, load in documents:
+            print(f'Loading {filename}')
+            documentsData.append(load())
+    originalIni, translateIni = combineDocumentsData(documentsData)
+    printTranslatedStats(originalIni, translateIni)
+    if args.check:
+        verifyDocuments(originalIni, translateIni, output, args, args.jobs)
+    print('Write output...')
+    if args.build_import:
+        print('WARNING: Build import ini mode')
+    with Profiler.Stage('merge'):
+        outputValues = mergeChangedKeys({}, None, originalIni, translateIni, version, args)
+        saveOutputValues(files, output, version, outputValues, args)
+    report.printSummary()
+    print(f'Built {output} in {time.perf_counter() - startTime:.2f}s, watching {len(documents)} documents (press Ctrl+C to stop)...')
+    try:
+        while True:
+            time.sleep(args.watch_interval)
+            changedDocuments = []
+            for index, (filename, load) in enumerate(documents):
+                state = getFileState(filename)
+                # document which failed to load is retried only after it is saved again
+                if state is not None and state != states[index] and state != failedStates[index]:
+                    changedDocuments.append((index, state))
+            if not changedDocuments:
+                continue
+            startTime = time.perf_counter()
+            with Profiler.Stage('update'):
+                for index, state in changedDocuments:
+                    filename, load = documents[index]
+                    print(f'Loading {filename}')
+                    try:
+                        documentsData[index] = load()
+                    except Exception as err:
+                        failedStates[index] = state
+                        print('Error: {0}'.format(err))
+                        continue
+                    states[index] = state
+                newOriginalIni, newTranslateIni = combineDocumentsData(documentsData)
+                changedKeys = getChangedKeys(originalIni.data, newOriginalIni.data)
+                changedKeys.update(getChangedKeys(translateIni.data, newTranslateIni.data))
+                originalIni, translateIni = newOriginalIni, newTranslateIni
+                if changedKeys:
+                    report.discard(changedKeys)
+                    if args.check:
+                        items = [ (key, value, translateIni.getKeyValue(key)) for key, value in originalIni.getItems()
+                                  if key in changedKeys and translateIni.isContainKey(key) ]
+                        for findings in getVerifier().verifyItems(items):
+                            report.extend(findings)
+                    outputValues = mergeChangedKeys(outputValues, changedKeys, originalIni, translateIni, version, args)
+                    saveOutputValues(files, output, version, outputValues, args)
+            report.flush()
+            if not changedKeys:
+                print('No keys changed')
+                continue
+            printTranslatedStats(originalIni, translateIni)
+            print(f'Updated {output}: {len(changedKeys)} changed keys in {time.perf_counter() - startTime:.2f}s')
+            report.printSummary()
+    except KeyboardInterrupt:
+        print('Stop watching')
+
+def loadReference(args):
+    global referenceIni
+    if not args.no_ref and not args.stream_ref and referenceIni is None:
+        print('Process reference ini...')
+        with Profiler.Stage('load-reference'):
+            referenceIni = LocalizationIni.FromIniFile(args.ref)
+
+def convertJob(job):
+    """Convert one job of batch, returns its statistics or None on error"""
+    global report
+    files, output, version, reportFilename, manifest, args = job
+    print(f'Convert {files} -> {output}')
+    report = Report(not args.quiet, reportFilename)
+    startTime = time.perf_counter()
+    try:
+        translatedCount, keysCount = convertDocuments(files, output, version, args, 1)
+        manifest.update()
+    except Exception as err:
+        report.flush()
+        print('Error: {0}'.format(err))
+        return None
+    finally:
+        report.close()
+    return { 'translated': translatedCount, 'keys': keysCount, 'findings': report.getSummary(), 'time': time.perf_counter() - startTime }
+
+def convertJobCaptured(job):
+    """Convert one job of batch in worker process, console output is returned to print jobs in order"""
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        statistics = convertJob(job)
+    return output.getvalue(), statistics
+
+def initBatchWorker(settings, state):
+    global splitDocuments, verifyOptions, referenceIni, verifier, innerThroughtRules
+    LocalizationIni.ApplySettings(settings)
+    # jobs are already spread over worker processes
+    LocalizationIni.SetLoadJobs(1)
+    splitDocuments, verifyOptions, referenceIni, verifier, innerThroughtRules, excludeKeys, verifyExceptions = state
+    excludeTranslateKeys.update(excludeKeys)
+    LocalizationVerifier.SetEnableVerifyExceptions(verifyExceptions)
+
+def getBatchJobs(args):
+    jobs = []
+    for index, job in enumerate(args.job):
+        if len(job) not in [ 2, 3 ]:
+            raise Exception(f'Batch job must be DOCUMENT OUTPUT [VERSION] - {job}')
+        reportFilename = None
+        if args.report:
+            root, ext = os.path.splitext(args.report)
+            reportFilename = f'{root}.{index + 1}{ext}'
+        files = [ job[0] ]
+        version = job[2] if len(job) == 3 else args.version
+        jobs.append((files, job[1], version, reportFilename, getBuildManifest(files, job[1], version, args), args))
+    return jobs
+
+def runBatch(args):
+    jobs = getBatchJobs(args)
+    results = [ 'up to date' ] * len(jobs)
+    pendingIndices = []
+    for index, (files, output, version, reportFilename, manifest, jobArgs) in enumerate(jobs):
+        if not args.force and manifest.isUpToDate():
+            print(f'Output {output} is up to date')
+        else:
+            pendingIndices.append(index)
+    if pendingIndices:
+        loadReference(args)
+        if args.no_inner_thought:
+            getInnerThroughtRules()
+        if args.check:
+            getVerifier()
+    pendingJobs = [ jobs[index] for index in pendingIndices ]
+    workersCount = min(args.jobs, len(pendingJobs))
+    if workersCount > 1 and not args.interactive:
+        # reference, rules and verifier are sent once to each worker
+        import concurrent.futures
+        state = (splitDocuments, verifyOptions, referenceIni, verifier, innerThroughtRules, excludeTranslateKeys, args.no_errors)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workersCount, initializer=initBatchWorker,
+                                                    initargs=(LocalizationIni.GetSettings(), state)) as executor:
+            for index, (output, statistics) in zip(pendingIndices, executor.map(convertJobCaptured, pendingJobs)):
+                sys.stdout.write(output)
+                results[index] = statistics
+    else:
+        for index, job in zip(pendingIndices, pendingJobs):
+            results[index] = convertJob(job)
+    print('Batch summary:')
+    for (files, output, version, reportFilename, manifest, jobArgs), statistics in zip(jobs, results):
+        if statistics is None:
+            print(f'  {files[0]} -> {output}: failed')
+            continue
+        if isinstance(statistics, str):
+            print(f'  {files[0]} -> {output}: {statistics}')
+            continue
+        text = f'  {files[0]} -> {output}: translated {statistics["translated"]}/{statistics["keys"]}'
+        if statistics['keys'] > 0:
+            text += ' ({0:.2f}%)'.format(statistics['translated'] / statistics['keys'] * 100)
+        findings = statistics['findings']
+        if findings:
+            text += ', findings: ' + ', '.join(f'{rule} {count}' for rule, count in findings.items())
+        print(text + ', {0:.2f}s'.format(statistics['time']))
+    return all(statistics is not None for statistics in results)
 
 def main(args):
+    global report, splitDocuments, verifyOptions
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
     try:
-        print(f'Convert multi language to ini (with ref {args.ref}): {args.files} -> {args.output}')
-        splitDocuments = []
+        # JSONL findings of batch jobs are written to numbered files by each job
+        if args.watch:
+            report = KeyedReport(not args.quiet, args.report)
+        else:
+            report = Report(not args.quiet, None if args.job else args.report)
+        if args.job:
+            if args.files:
+                print(f'Error: Input files and batch jobs specified together - {args.files}')
+                return 1
+            if args.watch:
+                print('Error: Watch mode is not supported for batch jobs')
+                return 1
+            print(f'Convert multi language to ini (with ref {args.ref}): {len(args.job)} batch jobs')
+        elif args.files:
+            print(f'Convert multi language to ini (with ref {args.ref}): {args.files} -> {args.output}')
+        else:
+            print('Error: No input files specified')
+            return 1
         verifyOptions = { 'allowed_characters_file': args.allowed_codepoints }
         LocalizationIni.SetEnableParseExceptions(args.no_errors)
         LocalizationIni.SetInteractiveMode(args.interactive)
+        LocalizationIni.SetCompactStorage(args.compact)
+        LocalizationIni.SetLoadJobs(args.jobs)
+        LocalizationVerifier.SetEnableVerifyExceptions(args.no_errors)
+        LocalizationVerifier.SetInteractiveMode(args.interactive)
+        if not args.no_cache:
+            LocalizationIni.SetParseCache(ParseCache(args.cache_dir, args.cache_size * 1024 * 1024))
         config = configparser.ConfigParser()
         if config.read('convert.ini'):
-            if 'general' in config:
-                generalConfig = dict(config.items('general'))
-                if 'exclude_translate_keys' in generalConfig:
-                    excludeTranslateKeys.update([x.strip() for x in filter(None, generalConfig['exclude_translate_keys'].split(',')) if len(x.strip()) > 0])
+            excludeTranslateKeys.update(excludeConfig(config).keys)
             if 'verify' in config:
                 verifyOptions.update(dict(config.items('verify')))
             if 'split-documents' in config:
                 splitDocuments = splitConfig(config['split-documents']).files
         else:
             print('Note: No convert config file - convert.ini')
-        if not args.build_import and args.interactive and args.version is None:
+        if args.verify_backend:
+            verifyOptions['backend'] = args.verify_backend
+        if not args.job and not args.build_import and args.interactive and args.version is None:
             version = input('Enter version (optional): ')
         else:
             version = args.version
-        if not args.no_ref:
-            print('Process reference ini...')
-            referenceIni = LocalizationIni.FromIniFile(args.ref)
-        if len(args.files) == 1:
-            print(f'Process multi language {args.files[0]}...')
-            inputInis = LocalizationIni.FromMultilang(args.files[0], splitDocuments)
-            originalIni = inputInis[0]
-            translateIni = inputInis[1]
-        elif len(args.files) == 2:
-            originalIni = LocalizationIni.FromIniFile(args.files[0])
-            translateIni = LocalizationIni.FromIniFile(args.files[1])
-        else:
-            print(f'Error: Too many input files specified - {args.files}')
-            return 1
-        if originalIni.getItemsCount() > 0:
-            print('Translated keys: {0}/{1} ({2:.2f}%)'.format(translateIni.getItemsCount(), originalIni.getItemsCount(),
-                                                               translateIni.getItemsCount() / originalIni.getItemsCount() * 100))
-            print('           left: {0}'.format(originalIni.getItemsCount() - translateIni.getItemsCount()))
-        if args.check:
-            print('Check translation...')
-            LocalizationVerifier.SetEnableVerifyExceptions(args.no_errors)
-            LocalizationVerifier.SetInteractiveMode(args.interactive)
-            LocalizationVerifier(verifyOptions).verify(originalIni, translateIni)
-        print('Write output...')
-        outputIni = LocalizationIni.Empty()
-        if referenceIni:
-            if args.build_import:
-                print('WARNING: Build import ini mode')
-                for key, value in referenceIni.getItems():
-                    if translateIni.isContainKey(key) and value == originalIni.getKeyValue(key):
-                        outputIni.putKeyValue(key, translateIni.getKeyValue(key))
-            else:
-                for key, value in referenceIni.getItems():
-                    writeValue = value
-                    if translateIni.isContainKey(key) and isTranslatableKey(key, args):
-                        writeValue = threeWayMerge(key, value, originalIni.getKeyValue(key), translateIni.getKeyValue(key), args)
-                    if version and (key in versionAddKeys):
-                        writeValue = writeValue + versionFormat.format(version)
-                        print(f'Info: Added version to key: {key}')
-                    outputIni.putKeyValue(key, writeValue)
+        if args.job:
+            if not runBatch(args):
+                return 1
+        elif args.watch:
+            # watch keeps reference loaded to merge changed keys again
+            args.stream_ref = False
+            loadReference(args)
+            watchDocuments(args.files, args.output, version, args)
         else:
-            for key, value in originalIni.getItems():
-                writeValue = value
-                if translateIni.isContainKey(key) and isTranslatableKey(key, args):
-                    writeValue = translateIni.getKeyValue(key)
-                if version and (key in versionAddKeys):
-                    writeValue = writeValue + versionFormat.format(version)
-                    print(f'Info: Added version to key: {key}')
-                outputIni.putKeyValue(key, writeValue)
-        outputIni.saveToIniFile(args.output)
+            manifest = getBuildManifest(args.files, args.output, version, args)
+            if not args.force and manifest.isUpToDate():
+                print(f'Output {args.output} is up to date, nothing to do (use --force to rebuild)')
+                print('Done')
+                return 0
+            loadReference(args)
+            convertDocuments(args.files, args.output, version, args, args.jobs)
+            manifest.update()
+            parseCache = LocalizationIni.GetParseCache()
+            if parseCache:
+                print(f'Parse cache: {parseCache.hits} hits, {parseCache.misses} misses')
+            print('Format signatures: {0} hits, {1} misses'.format(*LocalizationIni.GetFormatStats()))
+            report.printSummary()
     except KeyboardInterrupt:
         print('Interrupted')
         return 1
     except Exception as err:
+        report.flush()
         print('Error: {0}'.format(err))
         return 1
+    finally:
+        report.close()
+        if args.profile:
+            Profiler.Save(args.profile)
     print('Done')
     return 0
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Convert multi language translation documents to global.ini with reference global_ref.ini.', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    parser.add_argument('files', nargs='+', help='Input multi language translation document (XLSX, XLIFF) or 2 INI files - original & translate')
+    parser.add_argument('files', nargs='*', help='Input multi language translation document (XLSX, XLIFF) or 2 INI files - original & translate')
     parser.add_argument('-o', '--output', metavar='OUT_FILENAME', default='global.ini', help='Directs the output to a file name of your choice')
     parser.add_argument('-r', '--ref', metavar='REF_FILENAME', default='global_ref.ini', help='Reference game global.ini')
+    parser.add_argument('--job', nargs='+', action='append', metavar='ARG', default=None,
+                        help='Batch job: multi language document, output INI and optional version, may be repeated to convert several languages with one loaded reference')
     parser.add_argument('-v', '--version', default=None, help='Add localization version (displayed before main menu)')
     parser.add_argument('-c', '--check', default=True, help='Check for simple mistakes (missing variables, , ect.)')
     parser.add_argument('-a', '--allowed-codepoints', metavar='CODEPOINT_FILENAME', default='allowed_codepoints.txt', help='File with all allowed codepoints for translation file check')
@@ -157,6 +500,21 @@ if __name__ == "__main__":
     parser.add_argument('--no-outdated-translation', action='store_true', default=False, help='Do not allow outdated translation based on global_ref.ini')
     parser.add_argument('--no-inner-thought', action='store_true', default=False, help='Do not translate known Inner Thought keys (3D font)')
     parser.add_argument('--no-errors', action='store_true', default=False, help='Do not allow errors and break after first error')
+    parser.add_argument('-j', '--jobs', metavar='N', type=int, default=1, help='Number of worker processes used to load split documents and verify translation or to run batch jobs')
+    parser.add_argument('--verify-backend', choices=[ 'loop', 'columns' ], default=None, help='Verify each key in loop or scan whole columns first and verify only matched keys (default from convert.ini [verify] backend or loop)')
+    parser.add_argument('--stream-ref', action='store_true', default=False, help='Read reference global_ref.ini lazily while writing output instead of loading it whole')
+    parser.add_argument('--compact', action='store_true', default=False, help='Keep loaded INI data in compact buffers to reduce peak and resident memory, loading and key lookups are several times slower')
+    parser.add_argument('--cache-dir', metavar='DIR', default=ParseCache.DefaultDirectory(), help='Directory of parsed input files cache')
+    parser.add_argument('--cache-size', metavar='MIB', type=int, default=512, help='Maximum size of parsed input files cache in MiB')
+    parser.add_argument('--no-cache', action='store_true', default=False, help='Do not use parsed input files and verification findings cache')
+    parser.add_argument('--recheck', action='store_true', default=False, help='Verify all translations again ignoring cached findings')
+    parser.add_argument('--report', metavar='JSONL_FILENAME', default=None, help='Write verify and merge findings to JSON lines file (numbered per job in batch mode)')
+    parser.add_argument('-q', '--quiet', action='store_true', default=False, help='Do not print verify and merge findings, only summary')
+    parser.add_argument('--force', action='store_true', default=False, help='Rebuild output even when build manifest shows that inputs are not changed')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of stages and write summary to JSON file (stages of batch jobs run by worker processes are not included)')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-ini, load-xliff, load-xlsx-columns, verify, merge, save-ini, ...) and dump it next to profile summary')
+    parser.add_argument('--watch', action='store_true', default=False, help='Keep running and build output again on each change of input documents, only changed keys are verified and merged again')
+    parser.add_argument('--watch-interval', metavar='SECONDS', type=float, default=0.25, help='Interval of polling input documents for changes in watch mode')
     parser.add_argument('--build-import', action='store_true', default=False, help='Build import INI with only translation that match global_ref.ini')
     sys.exit(main(parser.parse_args()))
 
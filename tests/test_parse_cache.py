@@ -0,0 +1,90 @@
+# Parse cache entries are served only for the same input file and loader code
+
+import os
+import sys
+import shutil
+import tempfile
+import zipfile
+import unittest
+import unittest.mock
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from modules.localization import *
+from modules.cache import ParseCache
+from modules.xlsx import XlsxReader, XlsxWriter
+
+modulesPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modules')
+
+class ParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.tempDir, 'cache')
+        self.filename = os.path.join(self.tempDir, 'global.ini')
+        LocalizationIni.SaveItemsToIniFile(self.filename, [ ('k', 'B') ])
+
+    def tearDown(self):
+        LocalizationIni.SetParseCache(None)
+        shutil.rmtree(self.tempDir)
+
+    def load(self, cache):
+        LocalizationIni.SetParseCache(cache)
+        return list(LocalizationIni.FromIniFile(self.filename).getItems())
+
+    def copyLoaderSources(self):
+        sourcesPath = os.path.join(self.tempDir, 'modules')
+        os.makedirs(sourcesPath)
+        filenames = []
+        for name in ('localization.py', 'storage.py', 'xlsx.py'):
+            filenames.append(os.path.join(sourcesPath, name))
+            shutil.copyfile(os.path.join(modulesPath, name), filenames[-1])
+        return filenames
+
+    def testSameLoaderHits(self):
+        self.assertEqual(self.load(ParseCache(self.cacheDir)), [ ('k', 'B') ])
+        cache = ParseCache(self.cacheDir)
+        self.assertEqual(self.load(cache), [ ('k', 'B') ])
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def testDefaultLoaderDigest(self):
+        filenames = [ os.path.join(modulesPath, name) for name in ('localization.py', 'storage.py', 'xlsx.py') ]
+        self.assertEqual(ParseCache(self.cacheDir).loaderDigest, ParseCache.GetLoaderDigest(filenames))
+
+    def testChangedLoaderMisses(self):
+        filenames = self.copyLoaderSources()
+        oldCache = ParseCache(self.cacheDir, loaderFilenames=filenames)
+        self.load(oldCache)
+        # entry written by older loader code with different output, last parameter is compact storage
+        oldCache.put(oldCache.getKey(self.filename, 'ini', (False,)), { 'k': 'stale' })
+        self.assertEqual(self.load(ParseCache(self.cacheDir, loaderFilenames=filenames)), [ ('k', 'stale') ])
+        with open(filenames[2], 'a', encoding='utf-8') as sourceFile:
+            sourceFile.write('\n# changed loader\n')
+        cache = ParseCache(self.cacheDir, loaderFilenames=filenames)
+        self.assertEqual(self.load(cache), [ ('k', 'B') ])
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def writeEscapedXlsx(self):
+        """XLSX document with k=_x0042_ cell text, escape of k=B"""
+        plainFilename = os.path.join(self.tempDir, 'plain.xlsx')
+        filename = os.path.join(self.tempDir, 'global.ini.xlsx')
+        with XlsxWriter(plainFilename, 'global.ini') as writer:
+            writer.append([ 'en' ])
+            writer.append([ 'k=Q' ])
+        with zipfile.ZipFile(plainFilename) as inputZip, zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as outputZip:
+            for item in inputZip.infolist():
+                outputZip.writestr(item, inputZip.read(item.filename).replace(b'k=Q<', b'k=_x0042_<'))
+        return filename
+
+    def testOldXlsxReaderEntryNotServed(self):
+        filename = self.writeEscapedXlsx()
+        # reader and cache format before _xHHHH_ escapes were decoded
+        with unittest.mock.patch.object(ParseCache, '_ParseCache__formatVersion', 1), \
+             unittest.mock.patch.object(XlsxReader, '_XlsxReader__Unescape', staticmethod(lambda text: text)):
+            LocalizationIni.SetParseCache(ParseCache(self.cacheDir))
+            self.assertEqual(list(LocalizationIni.FromXlsxFile(filename, 'global.ini').getItems()), [ ('k', '_x0042_') ])
+        cache = ParseCache(self.cacheDir)
+        LocalizationIni.SetParseCache(cache)
+        self.assertEqual(list(LocalizationIni.FromXlsxFile(filename, 'global.ini').getItems()), [ ('k', 'B') ])
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# Requests to verify_server.py handlers over local HTTP connection
+
+import os
+import sys
+import json
+import threading
+import unittest
+import http.client
+import urllib.parse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import verify_server
+from modules.localization import *
+
+class VerifyServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        referenceIni = LocalizationIni.Empty()
+        referenceIni.putKeyValue('mission_Title', 'Deliver %s cargo')
+        verify_server.referenceIni = referenceIni
+        verify_server.verifier = LocalizationVerifier({})
+        cls.server = verify_server.http.server.ThreadingHTTPServer(('127.0.0.1', 0), verify_server.VerifyRequestHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def request(self, method, path, params):
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.server_address[1])
+        try:
+            if method == 'GET':
+                connection.request('GET', path + '?' + urllib.parse.urlencode(params))
+            else:
+                connection.request('POST', path, json.dumps(params), { 'Content-Type': 'application/json' })
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def testBlankTranslation(self):
+        for method in ('GET', 'POST'):
+            with self.subTest(method=method):
+                status, result = self.request(method, '/verify', { 'key': 'mission_Title', 'translation': '' })
+                self.assertEqual(status, 200)
+                self.assertFalse(result['valid'])
+                self.assertEqual([ finding['rule'] for finding in result['findings'] ], [ 'empty-translation' ])
+
+    def testBlankOriginal(self):
+        for method in ('GET', 'POST'):
+            with self.subTest(method=method):
+                status, result = self.request(method, '/verify', { 'key': 'mission_Title', 'translation': 'Text', 'original': '' })
+                self.assertEqual(status, 200)
+                self.assertTrue(result['valid'])
+
+    def testMissingTranslation(self):
+        for method in ('GET', 'POST'):
+            with self.subTest(method=method):
+                status, result = self.request(method, '/verify', { 'key': 'mission_Title' })
+                self.assertEqual(status, 400)
+                self.assertEqual(result['error'], 'Missing parameter - translation')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,12 @@
 #!/usr/bin/python
 
+import os
 import sys
 import argparse
 from modules.localization import * 
+from modules.cache import ParseCache, BuildManifest
+from modules.report import Finding, Report
+from modules.profiler import Profiler
 
 charactersMap = dict({
     # Fix missing in font characters
@@ -20,6 +24,10 @@ charactersMap = dict({
     'Є': 'E',
 })
 
+# sources of tool which define content of output together with input
+toolFilenames = [ 'transform_ini.py', 'modules/localization.py', 'modules/storage.py' ]
+report = Report()
+
 def transform_text(key, text):
     needReplace = False
     for ch in text:
@@ -35,30 +43,54 @@ def transform_text(key, text):
         if rch != ch:
             replaced.update(ch)
         result += rch
-    print(f'Note: replace characters in key: {key} {replaced}')
+    report.add(Finding('note', 'replace-characters', key, { 'characters': sorted(replaced) }))
     return result
 
 def main(args):
+    global report
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
     try:
+        report = Report(not args.quiet, args.report)
         if args.output:
             outputFilename = args.output
         else:
             outputFilename = args.input + ".out"
+        toolsPath = os.path.dirname(os.path.abspath(__file__))
+        manifest = BuildManifest(outputFilename, 'transform_ini',
+                                 BuildManifest.GetInputsDigest([ os.path.join(toolsPath, filename) for filename in toolFilenames ], sorted(charactersMap.items())))
+        inputHash = ParseCache.GetFileHash(args.input)
+        # input transformed in place is not available anymore, output hash is checked only
+        inPlace = os.path.abspath(args.input) == os.path.abspath(outputFilename)
+        if not args.test and not args.force and manifest.isUpToDate(None if inPlace else inputHash):
+            print(f'Output {outputFilename} is up to date, nothing to do (use --force to rebuild)')
+            print('Done')
+            return 0
         print(f'Load {args.input}...')
         inputIni = LocalizationIni.FromIniFile(args.input)
         print(f'Transform {args.input}...')
         outputIni = LocalizationIni.Empty()
-        for key, value in inputIni.getItems():
-            outputIni.putKeyValue(key, transform_text(key, value))
+        with Profiler.Stage('transform') as stage:
+            for key, value in inputIni.getItems():
+                outputIni.putKeyValue(key, transform_text(key, value))
+            stage.setItems(outputIni.getItemsCount())
+        report.flush()
         if not args.test:
             print(f'Save {outputFilename}...')
             outputIni.saveToIniFile(outputFilename)
+            manifest.update(inputHash)
+        report.printSummary()
     except KeyboardInterrupt:
         print('Interrupted')
         return 1
     except Exception as err:
+        report.flush()
         print('Error: {0}'.format(err))
         return 1
+    finally:
+        report.close()
+        if args.profile:
+            Profiler.Save(args.profile)
     print('Done')
     return 0
 
@@ -66,5 +98,10 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Transform INI file', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     parser.add_argument('input', nargs='?', metavar='FILENAME', default='global.ini', help='Input INI file')
     parser.add_argument('-o', '--output', metavar='FILENAME', default=None, help='Directs the output to a file name of your choice or input')
+    parser.add_argument('--report', metavar='JSONL_FILENAME', default=None, help='Write transform findings to JSON lines file')
+    parser.add_argument('-q', '--quiet', action='store_true', default=False, help='Do not print transform findings, only summary')
+    parser.add_argument('--force', action='store_true', default=False, help='Transform even when build manifest shows that input is not changed')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of stages and write summary to JSON file')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-ini, transform, save-ini) and dump it next to profile summary')
     parser.add_argument('--test', action='store_true', default=False, help='Test transform mapping without write output file')
     sys.exit(main(parser.parse_args()))
\ No newline at end of file
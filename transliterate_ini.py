@@ -5,10 +5,12 @@
 
 import sys
 import argparse
-from transliterate import translit
 from modules.localization import * 
+from modules.profiler import Profiler
 
 def main(args):
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
     try:
         if args.output:
             outputFilename = args.output
@@ -17,9 +19,12 @@ def main(args):
         print(f'Load {args.input}...')
         inputIni = LocalizationIni.FromIniFile(args.input)
         print(f'Transliterate {args.input}...')
+        from transliterate import translit
         outputIni = LocalizationIni.Empty()
-        for key, value in inputIni.getItems():
-            outputIni.putKeyValue(key, translit(value, args.lang, reversed=True))
+        with Profiler.Stage('transliterate') as stage:
+            for key, value in inputIni.getItems():
+                outputIni.putKeyValue(key, translit(value, args.lang, reversed=True))
+            stage.setItems(outputIni.getItemsCount())
         print(f'Save {outputFilename}...')
         outputIni.saveToIniFile(outputFilename)
     except KeyboardInterrupt:
@@ -28,6 +33,9 @@ def main(args):
     except Exception as err:
         print('Error: {0}'.format(err))
         return 1
+    finally:
+        if args.profile:
+            Profiler.Save(args.profile)
     print('Done')
     return 0
 
@@ -36,4 +44,6 @@ if __name__ == '__main__':
     parser.add_argument('input', nargs='?', metavar='FILENAME', default='global.ini', help='Input INI file')
     parser.add_argument('-o', '--output', metavar='FILENAME', default=None, help='Directs the output to a file name of your choice')
     parser.add_argument('-l', '--lang', metavar='LANGUAGE', default='uk', help='Input file language locale')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of stages and write summary to JSON file')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-ini, transliterate, save-ini) and dump it next to profile summary')
     sys.exit(main(parser.parse_args()))
\ No newline at end of file
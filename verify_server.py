@@ -0,0 +1,183 @@
+#!/usr/bin/python
+
+# Local verification service for CAT tools and editor plugins, answers JSON requests:
+# - /verify?key=KEY&translation=TEXT[&original=TEXT] => findings of translation
+# - /placeholders?key=KEY => unnamed and named formats of reference value
+# - /key?key=KEY => inner thought, excluded and split document of key
+# Parameters are passed in query string (GET) or JSON object body (POST)
+
+import sys
+import json
+import argparse
+import configparser
+import http.server
+import urllib.parse
+from modules.localization import *
+from modules.profiler import Profiler
+
+# loaded once at start and shared by all requests
+referenceIni = None
+verifier = None
+innerThroughtRules = None
+splitDocumentsConfig = None
+excludeKeysConfig = excludeConfig()
+logRequests = False
+
+class RequestError(Exception):
+    """Exception answered to client as JSON error with HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def getParam(params, name, required=True):
+    value = params.get(name)
+    if value is None:
+        if required:
+            raise RequestError(400, f'Missing parameter - {name}')
+        return None
+    if not isinstance(value, str):
+        raise RequestError(400, f'Parameter must be string - {name}')
+    return value
+
+def getReferenceValue(key):
+    value = referenceIni.getKeyValue(key)
+    if value is None:
+        raise RequestError(404, f'Unknown key - {key}')
+    return value
+
+def verifyTranslation(params):
+    key = getParam(params, 'key')
+    translation = getParam(params, 'translation')
+    original = getParam(params, 'original', False)
+    if original is None:
+        original = getReferenceValue(key)
+        findings = verifier.verifyValue(key, original, translation, referenceIni.getFormatSignature(key))
+    else:
+        findings = verifier.verifyValue(key, original, translation)
+    return {
+        'key': key,
+        'valid': not any(finding.level == 'error' for finding in findings),
+        'findings': [ { 'level': finding.level, 'rule': finding.rule, 'message': finding.getMessage(), 'details': finding.details } for finding in findings ],
+    }
+
+def getPlaceholders(params):
+    key = getParam(params, 'key')
+    original = getReferenceValue(key)
+    formats = referenceIni.getFormatSignature(key)
+    return { 'key': key, 'original': original, 'unnamed': formats.unnamed, 'named': sorted(formats.named) }
+
+def getKeyInfo(params):
+    key = getParam(params, 'key')
+    return {
+        'key': key,
+        'exists': referenceIni.isContainKey(key),
+        'inner_thought': innerThroughtRules.match(key, False) if innerThroughtRules else False,
+        'excluded': excludeKeysConfig.isExcludedKey(key),
+        # None is main document
+        'document': splitDocumentsConfig.searchKeyFile(key) if splitDocumentsConfig else None,
+    }
+
+requestHandlers = {
+    '/verify': verifyTranslation,
+    '/placeholders': getPlaceholders,
+    '/key': getKeyInfo,
+}
+
+class VerifyRequestHandler(http.server.BaseHTTPRequestHandler):
+    # keep connection open between requests of one client
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if logRequests:
+            super().log_message(format, *args)
+
+    def sendJson(self, status, result):
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def answer(self, path, readParams):
+        try:
+            handler = requestHandlers.get(path)
+            if handler is None:
+                raise RequestError(404, f'Unknown request - {path}')
+            Profiler.Count('requests' + path.replace('/', '.'))
+            self.sendJson(200, handler(readParams()))
+        except RequestError as err:
+            self.sendJson(err.status, { 'error': err.message })
+        except Exception as err:
+            self.sendJson(500, { 'error': str(err) })
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        # blank parameters are kept, cleared segment is sent as empty translation
+        self.answer(url.path, lambda: dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True)))
+
+    def do_POST(self):
+        def readParams():
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            try:
+                params = json.loads(body) if body else {}
+            except ValueError as err:
+                raise RequestError(400, f'Invalid JSON - {err}')
+            if not isinstance(params, dict):
+                raise RequestError(400, 'Request must be JSON object')
+            return params
+        self.answer(urllib.parse.urlsplit(self.path).path, readParams)
+
+def main(args):
+    global referenceIni, verifier, innerThroughtRules, splitDocumentsConfig, excludeKeysConfig, logRequests
+    if args.profile:
+        Profiler.Enable(args.profile_stage)
+    try:
+        print(f'Verify server (with ref {args.ref})')
+        logRequests = args.log
+        verifyOptions = { 'allowed_characters_file': args.allowed_codepoints }
+        config = configparser.ConfigParser()
+        if config.read('convert.ini'):
+            excludeKeysConfig = excludeConfig(config)
+            if 'verify' in config:
+                verifyOptions.update(dict(config.items('verify')))
+            if 'split-documents' in config:
+                splitDocumentsConfig = splitConfig(config['split-documents'])
+        else:
+            print('Note: No convert config file - convert.ini')
+        try:
+            innerThroughtRules = PrefixMatcher.FromRulesFile(args.inner_thought)
+        except FileNotFoundError:
+            print(f'Note: No inner thought rules file - {args.inner_thought}')
+        print('Process reference ini...')
+        referenceIni = LocalizationIni.FromIniFile(args.ref)
+        verifier = LocalizationVerifier(verifyOptions)
+        with http.server.ThreadingHTTPServer((args.host, args.port), VerifyRequestHandler) as server:
+            host, port = server.server_address[:2]
+            print(f'Listening on http://{host}:{port} (press Ctrl+C to stop)...', flush=True)
+            server.serve_forever()
+    except KeyboardInterrupt:
+        print('Stop server')
+    except Exception as err:
+        print('Error: {0}'.format(err))
+        return 1
+    finally:
+        if args.profile:
+            Profiler.Save(args.profile)
+    print('Done')
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local HTTP service verifying translations of single keys with loaded reference global_ref.ini.', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('-r', '--ref', metavar='REF_FILENAME', default='global_ref.ini', help='Reference game global.ini')
+    parser.add_argument('-a', '--allowed-codepoints', metavar='CODEPOINT_FILENAME', default='allowed_codepoints.txt', help='File with all allowed codepoints for translation check')
+    parser.add_argument('--inner-thought', metavar='RULES_FILENAME', default='inner_throught_keys.txt', help='Rules file of Inner Thought keys (3D font)')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on, keep local address unless clients are trusted')
+    parser.add_argument('-p', '--port', type=int, default=8765, help='Port to listen on, 0 picks free port')
+    parser.add_argument('--log', action='store_true', default=False, help='Print each request')
+    parser.add_argument('--profile', metavar='JSON_FILENAME', default=None, help='Measure time, memory and counters of loading and served requests and write summary to JSON file on stop')
+    parser.add_argument('--profile-stage', metavar='STAGE', default=None, help='Also run cProfile for stage (load-ini) and dump it next to profile summary')
+    sys.exit(main(parser.parse_args()))